@@ -0,0 +1,206 @@
+"""
+Columnar caseload analytics for saved assessments
+Keeps the categorical fields of every saved assessment in enum-coded NumPy arrays
+and answers group-by counts, cross-tabs and time-bucketed histograms with
+vectorized operations instead of rescanning stored documents.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Categorical columns, in the order the store reports them
+FIELDS = ('country', 'age_category', 'mental_state', 'financial_status', 'risk_level')
+
+BUCKET_SECONDS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+UNKNOWN = 'unknown'
+
+
+class CaseloadAnalytics:
+    """
+    One uint16 code array per categorical field plus a float64 timestamp array,
+    grown by doubling. Codes are assigned in order of first appearance; labels[field]
+    maps them back. sync() appends rows the assessment store has gained since the
+    last call, so every process sees every save exactly once.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._capacity = initial_capacity
+        self._size = 0
+        self._columns = {field: np.zeros(initial_capacity, dtype=np.uint16) for field in FIELDS}
+        self._timestamps = np.zeros(initial_capacity, dtype=np.float64)
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in FIELDS}
+        self.labels: Dict[str, List[str]] = {field: [] for field in FIELDS}
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self.syncs = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        value = value or UNKNOWN
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.labels[field])
+            self.labels[field].append(value)
+        return code
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for field in FIELDS:
+            grown = np.zeros(capacity, dtype=np.uint16)
+            grown[:self._size] = self._columns[field][:self._size]
+            self._columns[field] = grown
+        grown = np.zeros(capacity, dtype=np.float64)
+        grown[:self._size] = self._timestamps[:self._size]
+        self._timestamps = grown
+        self._capacity = capacity
+
+    def add_rows(self, rows: Sequence[Tuple]):
+        """Append (timestamp, country, age_category, mental_state, financial_status, risk_level) rows"""
+        with self._lock:
+            self._append(rows)
+
+    def _append(self, rows: Sequence[Tuple]):
+        count = len(rows)
+        if not count:
+            return
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        self._timestamps[start:end] = [row[0] for row in rows]
+        for position, field in enumerate(FIELDS, 1):
+            self._columns[field][start:end] = [self._code(field, row[position]) for row in rows]
+        self._size = end
+
+    def sync(self, store, batch_size: int = 50000) -> int:
+        """Append the store's rows newer than the last synced one; returns how many were added"""
+        added = 0
+        with self._lock:
+            while True:
+                rows = store.metadata_since(self._last_seq, batch_size)
+                if not rows:
+                    self.syncs += 1
+                    return added
+                self._append([(row['created_at'],) + tuple(row[field] for field in FIELDS) for row in rows])
+                self._last_seq = rows[-1]['seq']
+                added += len(rows)
+
+    def _snapshot(self) -> Tuple[int, Dict[str, np.ndarray], np.ndarray, Dict[str, List[str]]]:
+        """Consistent views of the filled part of every column"""
+        with self._lock:
+            size = self._size
+            return (size, {field: column[:size] for field, column in self._columns.items()},
+                    self._timestamps[:size], {field: list(labels) for field, labels in self.labels.items()})
+
+    def _mask(self, columns, timestamps, labels, filters: Dict[str, Optional[str]],
+              since: Optional[float], until: Optional[float]) -> np.ndarray:
+        mask = np.ones(len(timestamps), dtype=bool)
+        for field, value in filters.items():
+            if field not in FIELDS:
+                raise ValueError(f"Unknown analytics field: {field}")
+            if value is None:
+                continue
+            if value not in labels[field]:
+                return np.zeros(len(timestamps), dtype=bool)
+            mask &= columns[field] == labels[field].index(value)
+        if since is not None:
+            mask &= timestamps >= since
+        if until is not None:
+            mask &= timestamps < until
+        return mask
+
+    @staticmethod
+    def _check_field(field: str):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown analytics field: {field}")
+
+    def group_counts(self, by: str, since: Optional[float] = None, until: Optional[float] = None,
+                     **filters: Optional[str]) -> Dict[str, Any]:
+        """Number of assessments per value of one field"""
+        self._check_field(by)
+        size, columns, timestamps, labels = self._snapshot()
+        mask = self._mask(columns, timestamps, labels, filters, since, until)
+        counts = np.bincount(columns[by][mask], minlength=len(labels[by]))
+        return {
+            'total': int(mask.sum()),
+            'counts': {label: int(count) for label, count in zip(labels[by], counts) if count}
+        }
+
+    def crosstab(self, rows: str, columns: str, since: Optional[float] = None, until: Optional[float] = None,
+                 **filters: Optional[str]) -> Dict[str, Any]:
+        """Counts for every (rows value, columns value) pair, e.g. country x risk level"""
+        self._check_field(rows)
+        self._check_field(columns)
+        size, data, timestamps, labels = self._snapshot()
+        mask = self._mask(data, timestamps, labels, filters, since, until)
+
+        row_count, column_count = len(labels[rows]), len(labels[columns])
+        flat = data[rows][mask].astype(np.int64) * column_count + data[columns][mask]
+        table = np.bincount(flat, minlength=row_count * column_count).reshape(row_count, column_count)
+
+        row_keep = table.sum(axis=1) > 0
+        column_keep = table.sum(axis=0) > 0
+        return {
+            'total': int(mask.sum()),
+            'rows': [label for label, keep in zip(labels[rows], row_keep) if keep],
+            'columns': [label for label, keep in zip(labels[columns], column_keep) if keep],
+            'counts': table[row_keep][:, column_keep].tolist()
+        }
+
+    def histogram(self, bucket: str = 'day', by: Optional[str] = None, since: Optional[float] = None,
+                  until: Optional[float] = None, **filters: Optional[str]) -> Dict[str, Any]:
+        """Assessments per UTC time bucket, optionally split by one field"""
+        if bucket not in BUCKET_SECONDS:
+            raise ValueError(f"Unknown bucket: {bucket} (use {', '.join(BUCKET_SECONDS)})")
+        if by is not None:
+            self._check_field(by)
+
+        size, columns, timestamps, labels = self._snapshot()
+        mask = self._mask(columns, timestamps, labels, filters, since, until)
+        width = BUCKET_SECONDS[bucket]
+
+        # Bucket numbers relative to the earliest one index a bincount directly (no sort);
+        # buckets without assessments are dropped afterwards
+        bucket_ids = np.floor(timestamps[mask] / width).astype(np.int64)
+        first = int(bucket_ids.min()) if len(bucket_ids) else 0
+        positions = bucket_ids - first
+        span = int(positions.max()) + 1 if len(positions) else 0
+
+        if by is None:
+            counts = np.bincount(positions, minlength=span)
+            keep = np.flatnonzero(counts)
+            return {'bucket': bucket, 'bucket_starts': ((keep + first) * width).tolist(),
+                    'counts': counts[keep].tolist()}
+
+        category_count = len(labels[by])
+        flat = positions * category_count + columns[by][mask]
+        table = np.bincount(flat, minlength=span * category_count).reshape(span, category_count)
+        keep = np.flatnonzero(table.any(axis=1))
+        table = table[keep]
+        return {
+            'bucket': bucket,
+            'bucket_starts': ((keep + first) * width).tolist(),
+            'series': {label: table[:, code].tolist()
+                       for code, label in enumerate(labels[by]) if table[:, code].any()}
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Row count, memory footprint and distinct values per field"""
+        with self._lock:
+            return {
+                'rows': self._size,
+                'capacity': self._capacity,
+                'bytes': sum(column.nbytes for column in self._columns.values()) + self._timestamps.nbytes,
+                'last_seq': self._last_seq,
+                'syncs': self.syncs,
+                'categories': {field: len(labels) for field, labels in self.labels.items()}
+            }
@@ -0,0 +1,470 @@
+"""
+Segmented, append-only assessment log for audit and analytics
+
+Layout under the log directory (all times UTC):
+    dt=YYYY-MM-DD/                       one partition per day
+        <start_ms>-<pid>.jsonl.gz        segment: a sequence of gzip members ("blocks")
+        <start_ms>-<pid>.idx             sparse index: "<first_ts_ms> <offset> <length>" per block
+        <start_ms>-c<ms>.jsonl.gz        a compacted segment, named for when compaction ran
+
+Each line of a block is {"ts": <epoch seconds>, "assessment": {...}}. Blocks are
+independent gzip members, so a range scan looks up the first block that can hold
+the start time and decompresses from there. Segments roll by size, age and day.
+Retention (removing whole day partitions) and compaction (merging a finished day's
+segments into one) run from the command line, e.g. a daily cron job, never from
+the processes writing the log.
+"""
+
+import argparse
+import bisect
+import datetime
+import gzip
+import heapq
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from serialization import encode_json
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx'
+PARTITION_PREFIX = 'dt='
+
+# Compaction writes here inside the partition; the manifest (the compacted segment's
+# name, then its sources') is written last and marks the compacted segment complete
+COMPACTION_STAGING = '.compacting'
+COMPACTION_MANIFEST = 'manifest'
+
+
+def _utc_day(timestamp: float) -> datetime.date:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).date()
+
+
+def _utc_today() -> datetime.date:
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def partition_name(timestamp: float) -> str:
+    return PARTITION_PREFIX + _utc_day(timestamp).strftime('%Y-%m-%d')
+
+
+def partition_day(name: str) -> Optional[datetime.date]:
+    """Day of a partition directory name, or None if it is not a partition"""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.datetime.strptime(name[len(PARTITION_PREFIX):], '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _encode_line(timestamp: float, assessment: Dict[str, Any]) -> bytes:
+    return encode_json({'ts': timestamp, 'assessment': assessment}) + b'\n'
+
+
+class PartitionInUseError(RuntimeError):
+    """Raised when compaction is asked to rewrite a partition that may still be written"""
+
+
+class _SegmentWriter:
+    """One open segment and its index"""
+
+    def __init__(self, directory: str, start: float, writer_id: Optional[str] = None):
+        base = os.path.join(directory, f'{int(start * 1000):013d}-{writer_id or os.getpid()}')
+        self.path = base + SEGMENT_SUFFIX
+        self.started = start
+        self.partition = os.path.basename(directory)
+        self._data = open(self.path, 'ab')
+        self._index = open(base + INDEX_SUFFIX, 'a', encoding='ascii')
+        self.size = self._data.tell()
+
+    def write_block(self, first_timestamp: float, lines: List[bytes]):
+        offset = self.size
+        block = gzip.compress(b''.join(lines), compresslevel=6)
+        self._data.write(block)
+        self._data.flush()
+        # Index after data, so readers only ever see complete blocks
+        self._index.write(f'{int(first_timestamp * 1000)} {offset} {len(block)}\n')
+        self._index.flush()
+        self.size += len(block)
+
+    def close(self, sync: bool = False):
+        if sync:
+            os.fsync(self._data.fileno())
+            os.fsync(self._index.fileno())
+        self._data.close()
+        self._index.close()
+
+
+class AssessmentLog:
+    """
+    Appends assessments to the current segment. Records are buffered into blocks of
+    block_records lines and each block is written as one gzip member. A background
+    thread writes a partial block once it is block_interval seconds old, so an idle
+    process does not hold records in memory. Safe to share between threads; each
+    process writes its own segments.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_segment_age: float = 3600.0, block_records: int = 128, block_interval: float = 5.0):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.block_records = block_records
+        self.block_interval = block_interval
+
+        self._segment: Optional[_SegmentWriter] = None
+        self._pid: Optional[int] = None
+        self._block: List[bytes] = []
+        self._block_started = 0.0
+        self._block_opened = 0.0  # monotonic time the buffered block got its first record
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+        self.records = 0
+        self.blocks = 0
+        self.segments = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, assessment: Dict[str, Any], timestamp: Optional[float] = None):
+        """Add one assessment to the log"""
+        timestamp = time.time() if timestamp is None else timestamp
+        line = _encode_line(timestamp, assessment)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: never write through the parent's segment or buffer, and
+                # start a flusher thread of its own (threads do not survive fork)
+                self._segment, self._block, self._pid = None, [], os.getpid()
+                self._closed = threading.Event()
+                self._flusher = threading.Thread(target=self._flush_periodically, args=(self._closed,),
+                                                 name='assessment-log-flusher', daemon=True)
+                self._flusher.start()
+
+            if self._block and partition_name(timestamp) != partition_name(self._block_started):
+                self._flush_block()
+            if not self._block:
+                self._block_started = timestamp
+                self._block_opened = time.monotonic()
+            self._block.append(line)
+            self.records += 1
+
+            if len(self._block) >= self.block_records or timestamp - self._block_started >= self.block_interval:
+                self._flush_block()
+
+    def _flush_periodically(self, closed: threading.Event):
+        """Flusher thread: write the buffered block once it is block_interval seconds old"""
+        while not closed.wait(max(self.block_interval / 2, 0.05)):
+            with self._lock:
+                if self._pid != os.getpid() or not self._block:
+                    continue
+                if time.monotonic() - self._block_opened < self.block_interval:
+                    continue
+                try:
+                    self._flush_block()
+                except OSError as e:
+                    logger.error(f"Assessment log flush failed: {str(e)}")
+
+    def flush(self):
+        """Write the buffered block, if any"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._flush_block()
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        segment = self._segment_for(self._block_started)
+        segment.write_block(self._block_started, self._block)
+        self._block = []
+        self.blocks += 1
+
+    def _segment_for(self, timestamp: float) -> _SegmentWriter:
+        """The open segment, rolled first if it is full, too old or in a previous day's partition"""
+        segment = self._segment
+        if segment is not None and (segment.size >= self.max_segment_bytes
+                                    or timestamp - segment.started >= self.max_segment_age
+                                    or segment.partition != partition_name(timestamp)):
+            segment.close()
+            segment = self._segment = None
+
+        if segment is None:
+            directory = os.path.join(self.directory, partition_name(timestamp))
+            os.makedirs(directory, exist_ok=True)
+            segment = self._segment = _SegmentWriter(directory, timestamp)
+            self.segments += 1
+        return segment
+
+    def close(self):
+        """Flush the buffered block and close the open segment"""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            self._closed.set()
+            self._flush_block()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'records': self.records,
+                'buffered': len(self._block),
+                'blocks': self.blocks,
+                'segments': self.segments
+            }
+
+
+def _read_index(segment_path: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Block start times (ms) and (offset, length) spans of a segment's complete blocks"""
+    times, spans = [], []
+    index_path = segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+    try:
+        with open(index_path, 'r', encoding='ascii') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) != 3:
+                    break  # entry still being written
+                times.append(int(fields[0]))
+                spans.append((int(fields[1]), int(fields[2])))
+    except FileNotFoundError:
+        pass
+    return times, spans
+
+
+def _scan_segment(segment_path: str, start: Optional[float], end: Optional[float]) -> Iterator[Dict[str, Any]]:
+    """Yield the segment's records with start <= ts < end, seeking past earlier blocks"""
+    times, spans = _read_index(segment_path)
+    if not spans:
+        return
+
+    first_block = 0
+    if start is not None:
+        first_block = max(bisect.bisect_right(times, int(start * 1000)) - 1, 0)
+
+    with open(segment_path, 'rb') as f:
+        for block in range(first_block, len(spans)):
+            if end is not None and times[block] >= end * 1000:
+                return
+            offset, length = spans[block]
+            f.seek(offset)
+            for line in gzip.decompress(f.read(length)).splitlines():
+                record = json.loads(line)
+                if start is not None and record['ts'] < start:
+                    continue
+                if end is not None and record['ts'] >= end:
+                    continue
+                yield record
+
+
+def _partitions(directory: str) -> List[Tuple[datetime.date, str]]:
+    partitions = []
+    for name in os.listdir(directory) if os.path.isdir(directory) else []:
+        day = partition_day(name)
+        if day is not None:
+            partitions.append((day, os.path.join(directory, name)))
+    return sorted(partitions)
+
+
+def _segments(partition_path: str) -> List[str]:
+    return sorted(os.path.join(partition_path, name) for name in os.listdir(partition_path)
+                  if name.endswith(SEGMENT_SUFFIX))
+
+
+def scan(directory: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield {"ts", "assessment"} records with start <= ts < end. Partitions outside the
+    range are skipped by name; within a partition records are merged by timestamp.
+    """
+    start_day = _utc_day(start) if start is not None else None
+    end_day = _utc_day(end) if end is not None else None
+
+    for day, partition_path in _partitions(directory):
+        if (start_day is not None and day < start_day) or (end_day is not None and day > end_day):
+            continue
+        segment_scans = [_scan_segment(path, start, end) for path in _segments(partition_path)]
+        yield from heapq.merge(*segment_scans, key=lambda record: record['ts'])
+
+
+def drop_partitions_before(directory: str, cutoff: datetime.date) -> int:
+    """Remove every partition older than cutoff in one directory operation each"""
+    dropped = 0
+    for day, partition_path in _partitions(directory):
+        if day >= cutoff:
+            break
+        # Rename first so readers never see a half-deleted partition
+        doomed = os.path.join(directory, f'.drop-{os.path.basename(partition_path)}-{os.getpid()}')
+        try:
+            os.rename(partition_path, doomed)
+        except FileNotFoundError:
+            continue  # another process dropped it first
+        shutil.rmtree(doomed, ignore_errors=True)
+        dropped += 1
+    return dropped
+
+
+def _writer_alive(segment_path: str) -> bool:
+    """Whether the process that named the segment (<start_ms>-<pid>) is still running on this host"""
+    try:
+        pid = int(os.path.basename(segment_path)[:-len(SEGMENT_SUFFIX)].rsplit('-', 1)[1])
+    except (IndexError, ValueError):
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _publish_compaction(partition_path: str, staging: str) -> str:
+    """
+    Move a committed compacted segment into its partition, then delete its sources.
+    Every step can be repeated, so a compaction that stopped part way is finished by
+    calling this again. Until the sources are gone readers may see their records twice,
+    but never miss any.
+    """
+    with open(os.path.join(staging, COMPACTION_MANIFEST), 'r', encoding='ascii') as f:
+        compacted, *sources = f.read().split()
+
+    # The index goes first, so the segment never appears without it
+    for suffix in (INDEX_SUFFIX, SEGMENT_SUFFIX):
+        staged = os.path.join(staging, compacted + suffix)
+        if os.path.exists(staged):
+            os.replace(staged, os.path.join(partition_path, compacted + suffix))
+
+    for source in sources:
+        for suffix in (SEGMENT_SUFFIX, INDEX_SUFFIX):
+            try:
+                os.remove(os.path.join(partition_path, source + suffix))
+            except FileNotFoundError:
+                pass
+    shutil.rmtree(staging)
+    return os.path.join(partition_path, compacted + SEGMENT_SUFFIX)
+
+
+def compact_partition(directory: str, day: datetime.date, block_records: int = 1024,
+                      max_segment_age: float = 3600.0) -> Optional[str]:
+    """
+    Merge a finished day's segments into one time-ordered segment with larger blocks.
+    Raises PartitionInUseError if a segment was written within max_segment_age seconds
+    or its writer process is still running, since that writer may append to it again.
+    The compacted segment is published before any source is deleted; a compaction
+    that was interrupted is finished, or discarded if it was not yet committed, first.
+    """
+    partition_path = os.path.join(directory, PARTITION_PREFIX + day.strftime('%Y-%m-%d'))
+    staging = os.path.join(partition_path, COMPACTION_STAGING)
+    if os.path.isdir(staging):
+        if os.path.exists(os.path.join(staging, COMPACTION_MANIFEST)):
+            logger.info(f"Finishing an interrupted compaction of {partition_path}")
+            _publish_compaction(partition_path, staging)
+        else:
+            shutil.rmtree(staging)  # stopped before it was committed; the sources are untouched
+
+    sources = _segments(partition_path) if os.path.isdir(partition_path) else []
+    if len(sources) < 2:
+        return None
+
+    now = time.time()
+    for path in sources:
+        if now - os.stat(path).st_mtime < max_segment_age:
+            raise PartitionInUseError(f"{path} was written less than {max_segment_age:.0f}s ago")
+        if _writer_alive(path):
+            raise PartitionInUseError(f"{path} may still be open in its writer process")
+
+    records = heapq.merge(*[_scan_segment(path, None, None) for path in sources], key=lambda r: r['ts'])
+    os.makedirs(staging)
+    # No writer pid can start with "c", so the name cannot collide with a source's
+    compaction_id = f'c{int(now * 1000)}'
+
+    writer = None
+    block: List[bytes] = []
+    block_started = 0.0
+    for record in records:
+        if writer is None:
+            writer = _SegmentWriter(staging, record['ts'], compaction_id)
+        if not block:
+            block_started = record['ts']
+        block.append(_encode_line(record['ts'], record['assessment']))
+        if len(block) >= block_records:
+            writer.write_block(block_started, block)
+            block = []
+    if writer is None:
+        shutil.rmtree(staging)
+        return None
+    if block:
+        writer.write_block(block_started, block)
+    writer.close(sync=True)
+
+    names = [os.path.basename(path)[:-len(SEGMENT_SUFFIX)] for path in [writer.path] + sources]
+    manifest = os.path.join(staging, COMPACTION_MANIFEST)
+    with open(manifest + '.tmp', 'w', encoding='ascii') as f:
+        f.write('\n'.join(names) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest + '.tmp', manifest)
+
+    return _publish_compaction(partition_path, staging)
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan, compact or expire the assessment log")
+    parser.add_argument('directory', help="Assessment log directory")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    scan_parser = subcommands.add_parser('scan', help="Print records in a UTC time range as JSONL")
+    scan_parser.add_argument('--since', help="ISO start time (inclusive)")
+    scan_parser.add_argument('--until', help="ISO end time (exclusive)")
+
+    compact_parser = subcommands.add_parser('compact', help="Merge the segments of finished days")
+    compact_parser.add_argument('--day', help="Only this day (YYYY-MM-DD)")
+    compact_parser.add_argument('--min-age', type=float, default=3600.0,
+                                help="Skip partitions with a segment written within this many seconds")
+
+    retention_parser = subcommands.add_parser('retention', help="Drop partitions older than N days")
+    retention_parser.add_argument('--days', type=int, required=True)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'scan':
+        for record in scan(args.directory, _parse_time(args.since), _parse_time(args.until)):
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    elif args.command == 'compact':
+        today = _utc_today()
+        days = [datetime.date.fromisoformat(args.day)] if args.day else \
+            [day for day, _ in _partitions(args.directory) if day < today]
+        for day in days:
+            try:
+                path = compact_partition(args.directory, day, max_segment_age=args.min_age)
+            except PartitionInUseError as e:
+                print(f"Skipped {day}: {e}")
+                continue
+            if path:
+                print(f"Compacted {day} into {path}")
+    else:
+        cutoff = _utc_today() - datetime.timedelta(days=args.days)
+        print(f"Dropped {drop_partitions_before(args.directory, cutoff)} partitions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Persistence for completed assessments
+AssessmentStore is the interface used by the web backend and the CLI chatbot.
+SQLiteAssessmentStore keeps every assessment as a compressed blob next to a few
+indexed columns; JSONFileAssessmentStore keeps the original one-file-per-save layout.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_PATH = 'assessments.db'
+
+# Durability policies: "full" syncs every commit, "normal" syncs at WAL checkpoints, "off" leaves it to the OS
+FSYNC_POLICIES = ('full', 'normal', 'off')
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    country TEXT,
+    risk_level TEXT,
+    age_category TEXT,
+    mental_state TEXT,
+    payload BLOB NOT NULL,
+    financial_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_created_at ON assessments (created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_country ON assessments (country, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_risk_level ON assessments (risk_level, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_age_category ON assessments (age_category, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_mental_state ON assessments (mental_state, created_at);
+"""
+
+# Filterable columns accepted by query()
+FILTER_COLUMNS = ('country', 'risk_level', 'age_category', 'mental_state')
+
+
+def country_code(country: Optional[str]) -> Optional[str]:
+    """Normalize a country code or display name ("United States") to its code"""
+    if not country:
+        return None
+    return country.strip().lower().replace(' ', '_')
+
+
+def normalize_label(label: Optional[str]) -> Optional[str]:
+    """Normalize a coded option label or its display form ("Low Income") to its code ("low_income")"""
+    if not label:
+        return None
+    return label.strip().lower().replace(' ', '_')
+
+
+def assessment_metadata(assessment: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Pull the indexed fields out of a web or CLI assessment document"""
+    profile = assessment.get('patient_profile') or {}
+    risk = assessment.get('risk_indicators') or {}
+    return {
+        'country': country_code(profile.get('country') or assessment.get('country')),
+        'risk_level': risk.get('level'),
+        'age_category': assessment.get('age_category'),
+        'mental_state': profile.get('mental_state'),
+        'financial_status': normalize_label(profile.get('financial_status'))
+    }
+
+
+def encode_cursor(created_at: float, seq: int) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    return base64.urlsafe_b64encode(json.dumps([created_at, seq]).encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverse of encode_cursor; raises ValueError for anything else"""
+    try:
+        created_at, seq = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return float(created_at), int(seq)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_payload(assessment: Dict[str, Any]) -> bytes:
+    """Compact JSON, zlib-compressed"""
+    return zlib.compress(json.dumps(assessment, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+class AssessmentStore:
+    """Interface for assessment persistence backends"""
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def save(self, assessment: Dict[str, Any], assessment_id: Optional[str] = None) -> str:
+        """Persist one assessment and return its id"""
+        return self.save_many([assessment], [assessment_id] if assessment_id else None)[0]
+
+    def save_many(self, assessments: Iterable[Dict[str, Any]],
+                  assessment_ids: Optional[List[str]] = None) -> List[str]:
+        """Persist several assessments at once and return their ids"""
+        raise NotImplementedError
+
+    def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        """Return a stored assessment, or None"""
+        raise NotImplementedError
+
+    def query(self, limit: int = 100, since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[str] = None, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Return up to limit metadata rows matching the filters, newest first. Pass the
+        cursor of the last row of a page (see encode_cursor) to get the next page.
+        """
+        raise NotImplementedError
+
+    def metadata_since(self, seq: int, limit: int = 10000) -> List[Dict[str, Any]]:
+        """Return up to limit metadata rows saved after the row with the given seq, oldest first"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteAssessmentStore(AssessmentStore):
+    """
+    SQLite store in WAL mode. Each thread (and each forked process) gets its own
+    connection; save_many writes all rows in a single transaction.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, synchronous: str = 'NORMAL'):
+        self.path = path
+        self.synchronous = synchronous
+        self._local = threading.local()
+
+        connection = self._connection()
+        with connection:
+            connection.executescript(_SCHEMA)
+            columns = {row[1] for row in connection.execute('PRAGMA table_info(assessments)')}
+            if 'financial_status' not in columns:
+                # Version 1 databases: older rows keep a NULL financial status
+                connection.execute('ALTER TABLE assessments ADD COLUMN financial_status TEXT')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(f'PRAGMA synchronous={self.synchronous}')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def save_many(self, assessments: Iterable[Dict[str, Any]],
+                  assessment_ids: Optional[List[str]] = None) -> List[str]:
+        assessments = list(assessments)
+        ids = list(assessment_ids) if assessment_ids else [self.new_id() for _ in assessments]
+        now = time.time()
+
+        rows = []
+        for assessment_id, assessment in zip(ids, assessments):
+            metadata = assessment_metadata(assessment)
+            rows.append((assessment_id, now, metadata['country'], metadata['risk_level'],
+                         metadata['age_category'], metadata['mental_state'], metadata['financial_status'],
+                         encode_payload(assessment)))
+
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                'INSERT INTO assessments (id, created_at, country, risk_level, age_category, mental_state, '
+                'financial_status, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return ids
+
+    def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT payload FROM assessments WHERE id = ?', (assessment_id,)).fetchone()
+        return decode_payload(row[0]) if row else None
+
+    def query(self, limit: int = 100, since: Optional[float] = None, until: Optional[float] = None,
+              cursor: Optional[str] = None, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        # Every filter column has a (column, created_at) index whose implicit trailing
+        # rowid is seq, so each page is an index range scan in (created_at, seq) order
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter assessments by {column}")
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(country_code(value) if column == 'country' else value)
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('created_at < ?')
+            params.append(until)
+        if cursor is not None:
+            clauses.append('(created_at, seq) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self._connection().execute(
+            f'SELECT seq, id, created_at, country, risk_level, age_category, mental_state FROM assessments '
+            f'{where} ORDER BY created_at DESC, seq DESC LIMIT ?', params + [limit])
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def metadata_since(self, seq: int, limit: int = 10000) -> List[Dict[str, Any]]:
+        cursor = self._connection().execute(
+            'SELECT seq, created_at, country, risk_level, age_category, mental_state, financial_status '
+            'FROM assessments WHERE seq > ? ORDER BY seq LIMIT ?', (seq, limit))
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class JSONFileAssessmentStore(AssessmentStore):
+    """One pretty-printed JSON file per assessment, named by a collision-free id"""
+
+    def __init__(self, directory: str = '.', fsync: bool = False):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, assessment_id: str) -> str:
+        if not assessment_id.isalnum():
+            raise ValueError(f"Invalid assessment id: {assessment_id!r}")
+        return os.path.join(self.directory, f"web_assessment_{assessment_id}.json")
+
+    def save_many(self, assessments: Iterable[Dict[str, Any]],
+                  assessment_ids: Optional[List[str]] = None) -> List[str]:
+        assessments = list(assessments)
+        ids = list(assessment_ids) if assessment_ids else [self.new_id() for _ in assessments]
+        for assessment_id, assessment in zip(ids, assessments):
+            with open(self._path(assessment_id), 'w', encoding='utf-8') as f:
+                json.dump(assessment, f, indent=2, ensure_ascii=False)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        return ids
+
+    def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(assessment_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+def open_assessment_store(kind: str = 'sqlite', location: Optional[str] = None,
+                          fsync: str = 'normal') -> AssessmentStore:
+    """Create a store by name: "sqlite" (location is the database file) or "json" (location is a directory)"""
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {fsync}")
+    if kind == 'sqlite':
+        return SQLiteAssessmentStore(location or DEFAULT_DB_PATH, synchronous=fsync.upper())
+    if kind == 'json':
+        return JSONFileAssessmentStore(location or '.', fsync=fsync == 'full')
+    raise ValueError(f"Unknown assessment store: {kind}")
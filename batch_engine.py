@@ -0,0 +1,289 @@
+"""
+Vectorized batch assessment over enum-coded profile arrays
+Scores a whole structure-of-arrays batch (see ProfileBatch) with NumPy masks and
+table lookups: age categories, risk levels and, per profile, the id of the set of
+recommendation rules that fire. Rule ids refer to RecommendationRuleEngine.rules and
+are only turned back into text when a result row is expanded.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bulk_assessment import _chunked, read_profiles
+from compact_profile import CompactProfile, _Coded
+from crisis_detection import CRISIS_DETECTOR
+from recommendation_rules import (AGE_CATEGORIES, EMPLOYMENT_STATUSES, EXERCISE_LEVELS, FINANCIAL_STATUSES,
+                                  MENTAL_STATES, SECTION_CATEGORIES)
+from socialworkcountry import GlobalSocialWorkerChatbot
+
+RISK_LEVELS = ("low", "high", "critical")
+
+# Assessment passes in the order they are reported, keyed like the web assessment response
+PASS_SECTIONS = (
+    ('country_health_needs', 'health_needs'),
+    ('country_safety_needs', 'safety_needs'),
+    ('country_evidence_recommendations', 'evidence'),
+    ('general_recommendations', 'general')
+)
+
+_PROFILE_COMBINATIONS = len(MENTAL_STATES) * len(FINANCIAL_STATUSES) * len(EXERCISE_LEVELS)
+_MENTAL_POOR = MENTAL_STATES.index("Poor")
+_MENTAL_CRITICAL = MENTAL_STATES.index("Critical")
+
+
+@dataclass
+class ProfileBatch:
+    """
+    Structure-of-arrays profiles. Every categorical array holds positions in the
+    matching recommendation_rules domain tuple (the CompactProfile enum values), or -1
+    for a value outside it; country holds positions in countries.
+    """
+    countries: Tuple[str, ...]
+    country: np.ndarray
+    age: np.ndarray
+    mental_state: np.ndarray
+    financial_status: np.ndarray
+    exercise_level: np.ndarray
+    employment_status: np.ndarray
+    crisis_language: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.age)
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[CompactProfile],
+                      crisis_language: Optional[Sequence[bool]] = None) -> "ProfileBatch":
+        """Pack CompactProfiles (or PatientProfiles) into arrays"""
+        profiles = [profile if isinstance(profile, CompactProfile) else CompactProfile.from_patient_profile(profile)
+                    for profile in profiles]
+        country_codes: Dict[str, int] = {}
+        country = np.fromiter((country_codes.setdefault(p.country, len(country_codes)) for p in profiles),
+                              dtype=np.int32, count=len(profiles))
+
+        def codes(attribute: str) -> np.ndarray:
+            values = (getattr(p, attribute) for p in profiles)
+            return np.fromiter((int(value) if isinstance(value, _Coded) else -1 for value in values),
+                               dtype=np.int8, count=len(profiles))
+
+        return cls(
+            countries=tuple(country_codes),
+            country=country,
+            age=np.fromiter((p.age for p in profiles), dtype=np.int32, count=len(profiles)),
+            mental_state=codes('mental_code'),
+            financial_status=codes('financial_code'),
+            exercise_level=codes('exercise_code'),
+            employment_status=codes('employment_code'),
+            crisis_language=np.asarray(crisis_language, dtype=bool) if crisis_language is not None else None
+        )
+
+
+@dataclass
+class BatchResult:
+    """
+    Scores for a ProfileBatch. rule_set[i] indexes rule_sets, a -1 padded matrix of
+    rule ids in evaluation order; -1 means the profile had a value outside the coded
+    domains and was not assessed (score it with the per-patient methods instead).
+    """
+    engine: "VectorizedAssessmentEngine"
+    age_category: np.ndarray
+    risk_level: np.ndarray
+    rule_set: np.ndarray
+    rule_sets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rule_set)
+
+    @property
+    def assessed(self) -> np.ndarray:
+        return self.rule_set >= 0
+
+    def recommendation_ids(self, rows=None) -> np.ndarray:
+        """(rows x max rules) matrix of rule ids, padded with -1"""
+        rule_set = self.rule_set if rows is None else self.rule_set[rows]
+        ids = self.rule_sets[np.maximum(rule_set, 0)]
+        ids[rule_set < 0] = -1
+        return ids
+
+    def expand(self, row: int) -> Optional[Dict[str, Dict[str, List[str]]]]:
+        """The four assessment passes for one profile, as the per-patient methods return them"""
+        if self.rule_set[row] < 0:
+            return None
+        return self.engine.expand(self.rule_sets[self.rule_set[row]])
+
+
+class VectorizedAssessmentEngine:
+    """
+    Batch counterpart of the GlobalSocialWorkerChatbot assessment passes.
+    For each country in a batch it builds one lookup table from (age category,
+    mental state, financial status, exercise level, employment status) to a rule-set
+    id, using the compiled RecommendationRuleEngine buckets; scoring a batch is then
+    a handful of array operations regardless of its size.
+    """
+
+    def __init__(self, chatbot: Optional[GlobalSocialWorkerChatbot] = None):
+        self.chatbot = chatbot or GlobalSocialWorkerChatbot()
+        self.rule_engine = self.chatbot.rule_engine
+        self._set_ids: Dict[Tuple[int, ...], int] = {(): 0}
+        self._sets: List[Tuple[int, ...]] = [()]
+        self._country_tables: Dict[str, np.ndarray] = {}
+        self._employment_text = [status.lower() for status in EMPLOYMENT_STATUSES]
+
+    def _rule_set_id(self, rule_ids: Tuple[int, ...]) -> int:
+        set_id = self._set_ids.get(rule_ids)
+        if set_id is None:
+            set_id = self._set_ids[rule_ids] = len(self._sets)
+            self._sets.append(rule_ids)
+        return set_id
+
+    def _country_table(self, country: str) -> np.ndarray:
+        """(age category x profile combination x employment status) -> rule-set id for one country"""
+        table = self._country_tables.get(country)
+        if table is not None:
+            return table
+
+        buckets = self.rule_engine.coded_buckets(country)
+        table = np.empty((len(AGE_CATEGORIES) * _PROFILE_COMBINATIONS, len(EMPLOYMENT_STATUSES)), dtype=np.int32)
+        for combination, rules in enumerate(buckets):
+            for employment, text in enumerate(self._employment_text):
+                table[combination, employment] = self._rule_set_id(tuple(
+                    rule.rule_id
+                    for _, section in PASS_SECTIONS
+                    for rule in rules[section]
+                    if rule.employment_keyword is None or rule.employment_keyword in text
+                ))
+        self._country_tables[country] = table
+        return table
+
+    @staticmethod
+    def age_categories(age: np.ndarray) -> np.ndarray:
+        """Positions in AGE_CATEGORIES, matching GlobalSocialWorkerChatbot.determine_age_category"""
+        category = np.full(len(age), AGE_CATEGORIES.index("senior"), dtype=np.int8)
+        category[(age >= 18) & (age <= 25)] = AGE_CATEGORIES.index("young_adult")
+        category[(age >= 26) & (age <= 45)] = AGE_CATEGORIES.index("adult")
+        category[(age >= 46) & (age <= 64)] = AGE_CATEGORIES.index("middle_aged")
+        return category
+
+    @staticmethod
+    def risk_levels(mental_state: np.ndarray, crisis_language: Optional[np.ndarray] = None) -> np.ndarray:
+        """Positions in RISK_LEVELS, matching the web backend's risk assessment"""
+        level = np.zeros(len(mental_state), dtype=np.int8)
+        level[mental_state == _MENTAL_POOR] = RISK_LEVELS.index("high")
+        critical = mental_state == _MENTAL_CRITICAL
+        if crisis_language is not None:
+            critical = critical | crisis_language
+        level[critical] = RISK_LEVELS.index("critical")
+        return level
+
+    def assess(self, batch: ProfileBatch) -> BatchResult:
+        """Score every profile of the batch"""
+        age_category = self.age_categories(batch.age)
+        risk_level = self.risk_levels(batch.mental_state, batch.crisis_language)
+
+        assessed = ((batch.mental_state >= 0) & (batch.mental_state < len(MENTAL_STATES)) &
+                    (batch.financial_status >= 0) & (batch.financial_status < len(FINANCIAL_STATUSES)) &
+                    (batch.exercise_level >= 0) & (batch.exercise_level < len(EXERCISE_LEVELS)) &
+                    (batch.employment_status >= 0) & (batch.employment_status < len(EMPLOYMENT_STATUSES)) &
+                    (batch.country >= 0) & (batch.country < len(batch.countries)))
+
+        # One stacked table for the countries present; unknown countries are not assessed
+        known = self.chatbot.health_db.country_health_data
+        present = np.unique(batch.country[assessed])
+        slots = np.full(len(batch.countries), -1, dtype=np.int32)
+        tables = []
+        for code in present:
+            country = batch.countries[code]
+            if country in known:
+                slots[code] = len(tables)
+                tables.append(self._country_table(country))
+
+        country_slot = np.full(len(batch), -1, dtype=np.int32)
+        country_slot[assessed] = slots[batch.country[assessed]]
+        assessed &= country_slot >= 0
+
+        # Same mixed-radix order as RecommendationRuleEngine.coded_buckets
+        combination = (((age_category.astype(np.int32) * len(MENTAL_STATES) + batch.mental_state)
+                        * len(FINANCIAL_STATUSES) + batch.financial_status)
+                       * len(EXERCISE_LEVELS) + batch.exercise_level)
+
+        rule_set = np.full(len(batch), -1, dtype=np.int32)
+        if tables:
+            rule_set[assessed] = np.stack(tables)[country_slot[assessed], combination[assessed],
+                                                  batch.employment_status[assessed]]
+
+        return BatchResult(self, age_category, risk_level, rule_set, self.rule_set_matrix())
+
+    def rule_set_matrix(self) -> np.ndarray:
+        """Every rule set seen so far as a -1 padded (sets x max rules) matrix"""
+        width = max(len(rule_ids) for rule_ids in self._sets) or 1
+        matrix = np.full((len(self._sets), width), -1, dtype=np.int32)
+        for set_id, rule_ids in enumerate(self._sets):
+            matrix[set_id, :len(rule_ids)] = rule_ids
+        return matrix
+
+    def expand(self, rule_ids: Iterable[int]) -> Dict[str, Dict[str, List[str]]]:
+        """Turn rule ids back into the four passes' category -> messages dicts"""
+        results = {name: {category: [] for category in SECTION_CATEGORIES[section]}
+                   for name, section in PASS_SECTIONS}
+        names = dict((section, name) for name, section in PASS_SECTIONS)
+        for rule_id in rule_ids:
+            if rule_id < 0:
+                break
+            rule = self.rule_engine.rules[rule_id]
+            results[names[rule.section]][rule.category].append(rule.message)
+        return results
+
+
+def main(argv=None):
+    """
+    Score an NDJSON file of PatientProfile records and write one NDJSON line per non-blank
+    input line, in order and labelled with its line number; lines that are not valid
+    JSON or not PatientProfile-shaped are written as {"line": n, "error": ...}. The file
+    is read and scored --chunk-size lines at a time, so memory does not grow with it.
+    """
+    parser = argparse.ArgumentParser(description="Vectorized assessment of PatientProfile records")
+    parser.add_argument('input', help="NDJSON file with one PatientProfile object per line")
+    parser.add_argument('--expand', action='store_true', help="Write recommendation text instead of rule ids")
+    parser.add_argument('--chunk-size', type=int, default=8192, help="Input lines scored per vectorized batch")
+    args = parser.parse_args(argv)
+
+    engine = VectorizedAssessmentEngine()
+    # Rule ids are assigned as countries compile; compiling all of them in manifest
+    # order makes the written ids the same from run to run (and from chunk to chunk)
+    engine.rule_engine.compile_all()
+
+    with open(args.input, 'rb') as f:
+        for entries in _chunked(read_profiles(f), args.chunk_size):
+            profiles = [profile for _, profile, _ in entries if profile is not None]
+            # Crisis language in the notes makes a profile critical, as in the web assessment
+            crisis_language = [CRISIS_DETECTOR.is_crisis(profile.additional_notes or '') for profile in profiles]
+            result = engine.assess(ProfileBatch.from_profiles(profiles, crisis_language=crisis_language))
+
+            row = -1
+            for line_number, profile, error in entries:
+                if profile is None:
+                    sys.stdout.write(json.dumps({'line': line_number, 'error': error}, ensure_ascii=False) + '\n')
+                    continue
+
+                row += 1
+                line = {
+                    'line': line_number,
+                    'age_category': AGE_CATEGORIES[result.age_category[row]],
+                    'risk_level': RISK_LEVELS[result.risk_level[row]]
+                }
+                if result.rule_set[row] < 0:
+                    line['error'] = "Profile has values outside the coded domains"
+                elif args.expand:
+                    line.update(result.expand(row))
+                else:
+                    ids = result.rule_sets[result.rule_set[row]]
+                    line['rule_ids'] = ids[ids >= 0].tolist()
+                sys.stdout.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+
+if __name__ == "__main__":
+    main()
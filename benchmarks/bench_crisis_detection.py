@@ -0,0 +1,79 @@
+"""
+Throughput benchmark for the shared crisis-language detector
+Run from the project directory: python benchmarks/bench_crisis_detection.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_detection import CRISIS_DETECTOR
+
+# The two detectors the web backend and the validator used before
+LEGACY_WEB_KEYWORDS = ['suicide', 'kill myself', 'hurt myself', 'end it all', 'want to die']
+LEGACY_VALIDATOR_PATTERN = re.compile(
+    r'\b(?=[dehgknsw])(?:'
+    r'(?P<self_harm>(?:kill|die|suicide|harm|hurt)\s+(?:myself|self))'
+    r'|(?P<suicidal_intent>want\s+to\s+die|end\s+it\s+all)'
+    r'|(?P<hopelessness>no\s+point|give\s+up|hopeless)'
+    r')\b',
+    re.IGNORECASE
+)
+
+FILLER = {
+    "en": "Client reports long working hours and poor sleep over the last month. ",
+    "fr": "Le client signale de longues heures de travail et un sommeil médiocre. ",
+    "de": "Der Klient berichtet über lange Arbeitszeiten und schlechten Schlaf. ",
+    "ja": "クライアントは長時間労働と睡眠不足を報告しています。",
+}
+ENDING = {
+    "en": "Says there is no point anymore and sometimes wants to end it all.",
+    "fr": "Dit qu'il n'y a plus d'espoir et qu'il veut mourir.",
+    "de": "Sagt, alles sei hoffnungslos und er will sterben.",
+    "ja": "もう限界で、死にたいと言っています。",
+}
+
+
+def legacy_web(notes):
+    notes_lower = notes.lower()
+    return any(keyword in notes_lower for keyword in LEGACY_WEB_KEYWORDS)
+
+
+def legacy_validator(notes):
+    return [(match.lastgroup, match.span()) for match in LEGACY_VALIDATOR_PATTERN.finditer(notes)]
+
+
+def notes_of(language, size):
+    filler, ending = FILLER[language], ENDING[language]
+    return filler * max(1, (size - len(ending)) // len(filler)) + ending
+
+
+def mb_per_second(func, text):
+    """Best-of-five throughput in megabytes (of UTF-8 input) per second"""
+    number = max(10, 2000000 // len(text))
+    seconds = min(timeit.Timer(lambda: func(text)).repeat(repeat=5, number=number)) / number
+    return len(text.encode('utf-8')) / seconds / 1e6, seconds * 1e6
+
+
+def main():
+    print("Crisis-language scan throughput (MB/s, us/call)")
+    print(f"{'notes':<20}{'detector':>20}{'legacy web':>20}{'legacy validator':>20}{'hits':>6}")
+    print("-" * 86)
+    for language in FILLER:
+        for size in (1000, 20000):
+            text = notes_of(language, size)
+            row = f"{language + ' ' + str(size) + ' chars':<20}"
+            for func in (CRISIS_DETECTOR.find, legacy_web, legacy_validator):
+                rate, micros = mb_per_second(func, text)
+                row += f"{rate:>11.1f}{micros:>9.1f}"
+            print(row + f"{len(CRISIS_DETECTOR.find(text)):>6}")
+
+    print()
+    print(f"{len(CRISIS_DETECTOR.phrases)} phrases, compiled pattern {len(CRISIS_DETECTOR.pattern.pattern)} chars")
+
+
+if __name__ == "__main__":
+    main()
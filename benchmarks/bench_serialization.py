@@ -0,0 +1,80 @@
+"""
+Per-route JSON encode time: jsonify's standard-library encoding vs. serialization.py
+Payloads are built by the web backend itself; assessments carry the pre-encoded
+country context, recommendations and risk indicators as fragments.
+Run from the project directory: python benchmarks/bench_serialization.py
+"""
+
+import json
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.INFO)
+
+import web_backend
+from serialization import ENCODERS, Fragment
+
+FORM = {'name': 'John Doe', 'age': '37', 'country': 'japan', 'city': 'Tokyo', 'gender': 'male',
+        'employment': 'full_time', 'financial': 'low_income', 'exercise': 'sedentary', 'mental': 'poor',
+        'notes': 'Long working hours, poor sleep.'}
+
+
+def plain(value):
+    """The payload with every fragment turned back into an ordinary dict"""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def jsonify_encode(value):
+    """What Flask's default provider does for jsonify outside debug mode"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def route_payloads():
+    bot = web_backend.web_chatbot
+    forms = [dict(FORM, country=country, city=city, age=age, mental=mental)
+             for country, city in (('japan', 'Tokyo'), ('france', 'Lyon'), ('brazil', 'Recife'))
+             for age in ('22', '37', '71')
+             for mental in ('good', 'poor')]
+    results = [bot.generate_assessment(form) for form in forms * 6][:100]
+    return {
+        'POST /api/assess': bot.generate_assessment(FORM),
+        'POST /api/assess/batch (100)': {'success': True, 'count': len(results), 'failed': 0, 'results': results},
+        'POST /api/validate/batch': {'success': True, 'results': bot.validate_fields(FORM)},
+        'GET /api/bootstrap (uncached)': web_backend._bootstrap_payload(),
+    }
+
+
+def microseconds(func, payload):
+    number = max(20, int(200000 / max(1, len(jsonify_encode(plain(payload))))))
+    return min(timeit.Timer(lambda: func(payload)).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main():
+    encoders = [('jsonify (stdlib)', jsonify_encode, plain), ('json + fragments', ENCODERS['json'], None)]
+    if 'orjson' in ENCODERS:
+        encoders += [('orjson', ENCODERS['orjson'], plain), ('orjson + fragments', ENCODERS['orjson'], None)]
+
+    print("Encode time per response in microseconds (best of 5)")
+    print(f"{'route':<32}{'bytes':>8}" + ''.join(f"{name:>20}" for name, _, _ in encoders))
+    print("-" * (40 + 20 * len(encoders)))
+    for route, payload in route_payloads().items():
+        row = f"{route:<32}{len(jsonify_encode(plain(payload))):>8}"
+        for _, encode, prepare in encoders:
+            row += f"{microseconds(encode, prepare(payload) if prepare else payload):>20.1f}"
+        print(row)
+
+    fragments = sum(isinstance(value, Fragment) for value in route_payloads()['POST /api/assess'].values())
+    print()
+    print(f"An assessment response carries {fragments} fragments")
+
+
+if __name__ == "__main__":
+    main()
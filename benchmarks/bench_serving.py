@@ -0,0 +1,143 @@
+"""
+Throughput of the Flask development server vs. gunicorn (gunicorn.conf.py)
+Starts each server on a local port, drives it with keep-alive HTTP clients for a
+fixed time and reports requests per second and latency percentiles.
+Run from the project directory: python benchmarks/bench_serving.py [--duration 10] [--clients 16]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = [
+    {'name': 'John Doe', 'age': str(age), 'country': country, 'city': city, 'gender': 'male',
+     'employment': employment, 'financial': 'low_income', 'exercise': 'sedentary', 'mental': mental, 'notes': ''}
+    for age in (22, 37, 58, 71)
+    for country, city in (('japan', 'Tokyo'), ('united_kingdom', 'Manchester'), ('brazil', 'Recife'))
+    for employment in ('full_time', 'unemployed_seeking')
+    for mental in ('good', 'poor')
+]
+
+# (method, path, body): three assessments for every reference-data read
+REQUESTS = [('POST', '/api/assess', json.dumps(profile)) for profile in PROFILES]
+REQUESTS += [('GET', '/api/countries', None)] * (len(REQUESTS) // 3)
+
+
+def server_command(kind):
+    if kind == 'dev':
+        return [sys.executable, '-c', "import web_backend; web_backend.app.run(host='127.0.0.1', port=%d)"]
+    return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+
+def start_server(kind, port, env):
+    command = [part % port if '%d' in part else part for part in server_command(kind)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/countries')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+def client_process(port, threads, duration, offset, results):
+    """One load-generating process running several keep-alive client threads"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def run(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, position = [], offset + index * 7
+        while time.monotonic() < stop_at:
+            method, path, body = REQUESTS[position % len(REQUESTS)]
+            position += 1
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - started)
+            else:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((latencies, errors[0]))
+
+
+def drive(port, clients, processes, duration):
+    results = multiprocessing.Queue()
+    per_process = max(1, clients // processes)
+    children = [multiprocessing.Process(target=client_process,
+                                        args=(port, per_process, duration, index * 1000, results))
+                for index in range(processes)]
+    for child in children:
+        child.start()
+    latencies, errors = [], 0
+    for _ in children:
+        child_latencies, child_errors = results.get()
+        latencies.extend(child_latencies)
+        errors += child_errors
+    for child in children:
+        child.join()
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return len(latencies) / duration, percentile(0.5), percentile(0.99), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load per server")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument('--client-processes', type=int, default=max(1, min(4, os.cpu_count() or 1)),
+                        help="Load-generator processes")
+    parser.add_argument('--servers', default='dev,gunicorn', help="Comma-separated: dev, gunicorn")
+    args = parser.parse_args()
+
+    print(f"{args.clients} keep-alive clients, {args.duration:.0f}s per server, {os.cpu_count()} CPUs")
+    print(f"{'server':<34}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    print("-" * 72)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for port, kind in enumerate(args.servers.split(','), 5600):
+            env = dict(os.environ, PORT=str(port), ASSESSMENT_STORE_PATH=os.path.join(scratch, f'{kind}.db'))
+            label = 'flask dev server (threaded)' if kind == 'dev' else \
+                f"gunicorn gthread {env.get('WEB_CONCURRENCY', os.cpu_count())}w x {env.get('GUNICORN_THREADS', 4)}t"
+            process = start_server(kind, port, env)
+            try:
+                rate, p50, p99, errors = drive(port, args.clients, args.client_processes, args.duration)
+            finally:
+                process.terminate()
+                process.wait(30)
+            print(f"{label:<34}{rate:>10.0f}{p50:>10.2f}{p99:>10.2f}{errors:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Microbenchmark for GlobalInputValidator per-field cost
+Run from the project directory: python benchmarks/bench_validation.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from input_validation import GlobalInputValidator, _CITY_FORMAT, _NAME_FORMAT, _NAME_INVALID_CHARS
+
+NUMBER = 20000
+
+LONG_NOTES = ("Client reports long working hours and poor sleep over the last month. " * 12 +
+              "Says there is no point anymore and sometimes wants to end it all.")
+
+# The per-call pattern literals and three-pass crisis scan the validators used before
+LEGACY_CRISIS_PATTERNS = [
+    r'\b(kill|die|suicide|harm|hurt)\s+(myself|self)\b',
+    r'\b(want\s+to\s+die|end\s+it\s+all)\b',
+    r'\b(no\s+point|give\s+up|hopeless)\b'
+]
+
+
+def legacy_validate_name(name):
+    name = name.strip()
+    if re.search(r'[<>{}[\]\\|`~!@#$%^&*()+=]', name):
+        return False
+    return bool(re.match(r'^[A-Za-z\s\.\-\']+$', name))
+
+
+def legacy_validate_city(city):
+    return bool(re.match(r'^[A-Za-z\s\.\-\'àáâãäåæçèéêëìíîïñòóôõöøùúûüýÿ]+$', city.strip()))
+
+
+def legacy_crisis_hits(notes):
+    notes_lower = notes.strip().lower()
+    return [pattern for pattern in LEGACY_CRISIS_PATTERNS if re.search(pattern, notes_lower)]
+
+
+def per_call_us(func, *args):
+    """Best-of-five mean cost of one call in microseconds"""
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=5, number=NUMBER)) / NUMBER * 1e6
+
+
+def main():
+    validator = GlobalInputValidator()
+
+    print("Per-field validator cost")
+    print(f"{'field':<26}{'us/call':>10}")
+    print("-" * 36)
+    for label, func, args in [
+        ("name", validator.validate_name, ("Maria-Jose O'Neil",)),
+        ("age", validator.validate_age, ("42",)),
+        ("city", validator.validate_city, ("Manchester", "united_kingdom")),
+        ("city (typo)", validator.validate_city, ("Mancester", "united_kingdom")),
+        ("mental state", validator.validate_mental_state, ("poor",)),
+        ("notes (short)", validator.validate_additional_notes, ("Works long hours",)),
+        ("notes (long, 2 hits)", validator.validate_additional_notes, (LONG_NOTES,)),
+    ]:
+        print(f"{label:<26}{per_call_us(func, *args):>10.2f}")
+
+    print()
+    print("Pattern matching: precompiled vs per-call literals")
+    print(f"{'check':<26}{'current':>10}{'legacy':>10}")
+    print("-" * 46)
+    for label, current, legacy, arg in [
+        ("name patterns", lambda name: (_NAME_INVALID_CHARS.search(name), _NAME_FORMAT.match(name)),
+         legacy_validate_name, "Maria-Jose O'Neil"),
+        ("city pattern", _CITY_FORMAT.match, legacy_validate_city, "Manchester"),
+        ("crisis scan (short)", validator.find_crisis_language, legacy_crisis_hits, "Works long hours"),
+        ("crisis scan (long)", validator.find_crisis_language, legacy_crisis_hits, LONG_NOTES),
+    ]:
+        print(f"{label:<26}{per_call_us(current, arg):>10.2f}{per_call_us(legacy, arg):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Per-worker memory of gunicorn (gunicorn.conf.py) as the worker count grows
+For each configuration starts gunicorn, sends every worker a round of assessments and
+reference-data reads, then reads /proc/<pid>/smaps_rollup (Linux only) for the master
+and each worker. USS (private pages) is what one more worker really costs; "shared"
+is the part of a worker's RSS still shared copy-on-write with the master and siblings.
+Run from the project directory: python benchmarks/bench_worker_memory.py [--workers 1,2,4,8]
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_serving import REQUESTS, start_server
+
+# label -> environment; GC_FREEZE is read by wsgi.py, GUNICORN_PRELOAD by gunicorn.conf.py
+CONFIGURATIONS = {
+    'preload + gc.freeze': {'GC_FREEZE': '1', 'GUNICORN_PRELOAD': '1'},
+    'preload': {'GC_FREEZE': '0', 'GUNICORN_PRELOAD': '1'},
+    'no preload': {'GC_FREEZE': '0', 'GUNICORN_PRELOAD': '0'},
+}
+
+
+def smaps_rollup(pid):
+    """Memory counters of a process in kB: rss, pss, uss (private) and shared"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'uss': fields['Private_Clean'] + fields['Private_Dirty'],
+        'shared': fields['Shared_Clean'] + fields['Shared_Dirty'],
+    }
+
+
+def child_pids(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The parent pid is the second field after the parenthesised command name
+                if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return sorted(children)
+
+
+def exercise(port, rounds):
+    """One connection per request so the requests spread over all workers"""
+    for index in range(rounds):
+        method, path, body = REQUESTS[index % len(REQUESTS)]
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        connection.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+        connection.getresponse().read()
+        connection.close()
+
+
+def measure(port, workers, overrides, scratch, rounds):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               ASSESSMENT_STORE_PATH=os.path.join(scratch, f'{port}.db'), **overrides)
+    process = start_server('gunicorn', port, env)
+    try:
+        deadline = time.monotonic() + 30
+        while len(child_pids(process.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.2)
+        exercise(port, rounds * workers)
+        time.sleep(1)  # let the last saves flush
+        master = smaps_rollup(process.pid)
+        per_worker = [smaps_rollup(pid) for pid in child_pids(process.pid)]
+    finally:
+        process.terminate()
+        process.wait(30)
+    return master, per_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', default='1,2,4', help="Comma-separated worker counts")
+    parser.add_argument('--rounds', type=int, default=200, help="Requests per worker before measuring")
+    parser.add_argument('--configurations', default=','.join(CONFIGURATIONS),
+                        help="Comma-separated: " + ', '.join(CONFIGURATIONS))
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit("This report needs Linux /proc/<pid>/smaps_rollup")
+
+    print("Memory per gunicorn worker in MB (averages over workers); total = master RSS + sum of worker USS")
+    print(f"{'configuration':<22}{'workers':>8}{'RSS':>8}{'USS':>8}{'shared':>8}{'shared %':>10}"
+          f"{'PSS':>8}{'master':>8}{'total':>8}")
+    print("-" * 88)
+
+    port = 5700
+    with tempfile.TemporaryDirectory() as scratch:
+        for label in args.configurations.split(','):
+            for workers in (int(count) for count in args.workers.split(',')):
+                port += 1
+                master, per_worker = measure(port, workers, CONFIGURATIONS[label], scratch, args.rounds)
+                average = {key: sum(w[key] for w in per_worker) / len(per_worker) / 1024 for key in master}
+                total = (master['rss'] + sum(w['uss'] for w in per_worker)) / 1024
+                print(f"{label:<22}{len(per_worker):>8}{average['rss']:>8.1f}{average['uss']:>8.1f}"
+                      f"{average['shared']:>8.1f}{average['shared'] / average['rss'] * 100:>9.0f}%"
+                      f"{average['pss']:>8.1f}{master['rss'] / 1024:>8.1f}{total:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Build tool for the country data shards read by country_data.py
+
+    python build_country_shards.py convert    # write data/ from the legacy literals below
+    python build_country_shards.py manifest   # re-scan data/countries/ and rewrite the manifest
+
+The literals are the health database as it was originally embedded in
+GlobalHealthDatabase; after conversion the JSON shards are the source of truth.
+To add or edit a country, change its shard in data/countries/ and rerun "manifest".
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from country_data import COUNTRY_DATA_DIR, FORMAT_VERSION, MANIFEST_FILE
+
+COMMON_FILE = 'common.json'
+SHARD_DIR = 'countries'
+
+# Country-specific health statistics and common issues
+LEGACY_COUNTRY_HEALTH_DATA = {
+    "united_states": {
+        "common_health_issues": ["obesity", "diabetes", "heart_disease", "depression", "anxiety"],
+        "mental_health_prevalence": 0.26,  # 26% have mental health issues
+        "healthcare_system": "private_insurance",
+        "crisis_resources": ["988", "911"],
+        "cultural_considerations": ["individualistic_society", "stigma_around_mental_health"],
+        "treatment_accessibility": "insurance_dependent",
+        "preventive_care_focus": ["annual_checkups", "cancer_screenings", "vaccination"]
+    },
+    "canada": {
+        "common_health_issues": ["depression", "anxiety", "substance_abuse", "heart_disease"],
+        "mental_health_prevalence": 0.20,
+        "healthcare_system": "universal_healthcare",
+        "crisis_resources": ["988", "911"],
+        "cultural_considerations": ["multicultural_awareness", "indigenous_health_needs"],
+        "treatment_accessibility": "publicly_funded",
+        "preventive_care_focus": ["mental_health_screening", "chronic_disease_prevention"]
+    },
+    "united_kingdom": {
+        "common_health_issues": ["depression", "anxiety", "diabetes", "respiratory_disease"],
+        "mental_health_prevalence": 0.25,
+        "healthcare_system": "nhs",
+        "crisis_resources": ["999", "116 123 (Samaritans)"],
+        "cultural_considerations": ["class_awareness", "regional_variations"],
+        "treatment_accessibility": "free_at_point_of_care",
+        "preventive_care_focus": ["nhs_health_checks", "mental_health_first_aid"]
+    },
+    "australia": {
+        "common_health_issues": ["skin_cancer", "mental_health", "obesity", "heart_disease"],
+        "mental_health_prevalence": 0.22,
+        "healthcare_system": "medicare_plus_private",
+        "crisis_resources": ["000", "13 11 14 (Lifeline)"],
+        "cultural_considerations": ["indigenous_health_gap", "rural_isolation"],
+        "treatment_accessibility": "subsidized_healthcare",
+        "preventive_care_focus": ["skin_cancer_screening", "mental_health_plans"]
+    },
+    "germany": {
+        "common_health_issues": ["cardiovascular_disease", "depression", "diabetes", "cancer"],
+        "mental_health_prevalence": 0.18,
+        "healthcare_system": "statutory_insurance",
+        "crisis_resources": ["112", "0800 111 0 111"],
+        "cultural_considerations": ["work_life_balance", "privacy_concerns"],
+        "treatment_accessibility": "insurance_covered",
+        "preventive_care_focus": ["health_checkups", "workplace_wellness"]
+    },
+    "japan": {
+        "common_health_issues": ["cardiovascular_disease", "depression", "suicide_risk", "aging_related"],
+        "mental_health_prevalence": 0.15,
+        "healthcare_system": "universal_insurance",
+        "crisis_resources": ["110", "119"],
+        "cultural_considerations": ["mental_health_stigma", "work_stress", "aging_society"],
+        "treatment_accessibility": "insurance_covered_limited_mental_health",
+        "preventive_care_focus": ["longevity_care", "workplace_stress_management"]
+    },
+    "india": {
+        "common_health_issues": ["diabetes", "cardiovascular_disease", "respiratory_disease", "mental_health"],
+        "mental_health_prevalence": 0.13,
+        "healthcare_system": "mixed_public_private",
+        "crisis_resources": ["100", "108"],
+        "cultural_considerations": ["family_centered_care", "traditional_medicine", "stigma"],
+        "treatment_accessibility": "variable_access",
+        "preventive_care_focus": ["diabetes_prevention", "maternal_health"]
+    },
+    "brazil": {
+        "common_health_issues": ["violence_related_trauma", "infectious_disease", "mental_health", "diabetes"],
+        "mental_health_prevalence": 0.18,
+        "healthcare_system": "sus_public_system",
+        "crisis_resources": ["190", "188"],
+        "cultural_considerations": ["family_support", "socioeconomic_disparities"],
+        "treatment_accessibility": "public_system_limited_resources",
+        "preventive_care_focus": ["infectious_disease_prevention", "violence_prevention"]
+    },
+    "south_africa": {
+        "common_health_issues": ["hiv_aids", "tuberculosis", "mental_health", "violence_trauma"],
+        "mental_health_prevalence": 0.16,
+        "healthcare_system": "two_tier_system",
+        "crisis_resources": ["10177", "112"],
+        "cultural_considerations": ["ubuntu_philosophy", "language_diversity", "historical_trauma"],
+        "treatment_accessibility": "public_private_divide",
+        "preventive_care_focus": ["hiv_prevention", "tb_screening", "trauma_informed_care"]
+    },
+    "sweden": {
+        "common_health_issues": ["depression", "anxiety", "seasonal_affective_disorder",
+                                 "cardiovascular_disease"],
+        "mental_health_prevalence": 0.17,
+        "healthcare_system": "universal_healthcare",
+        "crisis_resources": ["112", "90101"],
+        "cultural_considerations": ["seasonal_depression", "work_life_balance", "gender_equality"],
+        "treatment_accessibility": "publicly_funded",
+        "preventive_care_focus": ["mental_health_promotion", "preventive_medicine"]
+    },
+    "israel": {
+        "common_health_issues": ["anxiety", "ptsd", "cardiovascular_disease", "diabetes", "depression"],
+        "mental_health_prevalence": 0.21,
+        "healthcare_system": "universal_healthcare_with_supplements",
+        "crisis_resources": ["100", "101", "1201"],
+        "cultural_considerations": ["trauma_informed_care", "military_service_impact",
+                                    "multicultural_population", "religious_considerations"],
+        "treatment_accessibility": "universal_with_private_options",
+        "preventive_care_focus": ["trauma_screening", "stress_management", "community_resilience"]
+    },
+    "france": {
+        "common_health_issues": ["depression", "anxiety", "cardiovascular_disease", "cancer",
+                                 "substance_abuse"],
+        "mental_health_prevalence": 0.19,
+        "healthcare_system": "social_security_system",
+        "crisis_resources": ["15", "112", "3114"],
+        "cultural_considerations": ["work_life_balance", "social_solidarity", "secularism",
+                                    "intellectual_approach_to_therapy"],
+        "treatment_accessibility": "highly_subsidized",
+        "preventive_care_focus": ["mental_health_destigmatization", "workplace_wellness", "social_medicine"]
+    }
+}
+
+# Age-based treatment effectiveness data (enhanced with country considerations)
+LEGACY_AGE_BASED_TREATMENTS = {
+    "young_adult": {
+        "most_effective": ["peer_support", "digital_therapy", "group_therapy", "crisis_text_services"],
+        "considerations": ["Technology-friendly interventions", "Peer connections crucial",
+                           "Financial constraints common"],
+        "country_specific": {
+            "japan": ["work_stress_counseling", "social_anxiety_support"],
+            "india": ["family_therapy_integration", "traditional_medicine_complement"],
+            "sweden": ["seasonal_light_therapy", "student_support_services"],
+            "israel": ["trauma_informed_therapy", "military_transition_support", "multicultural_peer_groups"],
+            "france": ["psychoanalytic_approaches", "university_counseling", "secular_therapy_options"]
+        }
+    },
+    "adult": {
+        "most_effective": ["cbt", "family_therapy", "workplace_eap", "community_programs"],
+        "considerations": ["Work-life balance issues", "Family responsibilities", "Career pressures"],
+        "country_specific": {
+            "germany": ["workplace_wellness_programs", "stress_management"],
+            "united_states": ["insurance_navigation_support", "debt_counseling"],
+            "brazil": ["community_health_workers", "family_integration"],
+            "israel": ["reserve_duty_counseling", "work_security_balance", "multicultural_workplace_support"],
+            "france": ["workplace_rights_advocacy", "social_protection_navigation", "burnout_prevention"]
+        }
+    },
+    "middle_aged": {
+        "most_effective": ["individual_therapy", "support_groups", "medical_integration",
+                           "lifestyle_counseling"],
+        "considerations": ["Health complications increasing", "Career transitions", "Family caregiving roles"],
+        "country_specific": {
+            "japan": ["aging_parent_care_support", "retirement_planning"],
+            "australia": ["skin_cancer_prevention", "rural_telehealth"],
+            "south_africa": ["chronic_disease_management", "family_health_education"],
+            "israel": ["chronic_stress_management", "intergenerational_trauma_support"],
+            "france": ["midlife_career_transitions", "social_security_optimization"]
+        }
+    },
+    "senior": {
+        "most_effective": ["medical_social_work", "senior_centers", "home_services", "family_support"],
+        "considerations": ["Physical health priority", "Social isolation risk", "Fixed income challenges"],
+        "country_specific": {
+            "canada": ["indigenous_elder_care", "winter_wellness_programs"],
+            "united_kingdom": ["nhs_elderly_care", "community_befriending"],
+            "sweden": ["seasonal_depression_support", "active_aging_programs"],
+            "israel": ["holocaust_survivor_support", "veteran_elder_care", "religious_community_integration"],
+            "france": ["social_solidarity_programs", "retirement_home_alternatives",
+                       "cultural_activity_integration"]
+        }
+    }
+}
+
+# Financial status impact with country context
+LEGACY_FINANCIAL_TREATMENT_MAP = {
+    "low_income": {
+        "accessible": ["community_health_centers", "sliding_scale_therapy", "support_groups",
+                       "crisis_hotlines"],
+        "barriers": ["Limited transportation", "Work schedule conflicts", "Childcare needs"],
+        "country_resources": {
+            "united_states": ["medicaid", "community_health_centers", "211_services"],
+            "canada": ["provincial_health_services", "community_mental_health"],
+            "united_kingdom": ["nhs_services", "local_authority_support"],
+            "australia": ["bulk_billing_gps", "community_health_services"],
+            "germany": ["statutory_insurance_coverage", "social_services"],
+            "india": ["government_health_schemes", "ngos", "community_workers"],
+            "brazil": ["sus_services", "community_health_agents"],
+            "south_africa": ["public_health_facilities", "community_organizations"],
+            "sweden": ["regional_health_services", "municipal_support"],
+            "japan": ["national_health_insurance", "municipal_services"],
+            "israel": ["kupat_cholim_services", "municipal_welfare_departments", "nonprofit_organizations"],
+            "france": ["cpam_coverage", "municipal_social_services", "associations_support"]
+        }
+    },
+    "moderate_income": {
+        "accessible": ["employer_eap", "insurance_covered_therapy", "community_programs", "online_therapy"],
+        "barriers": ["Insurance copays", "Time constraints", "Stigma concerns"],
+        "country_resources": {
+            "united_states": ["employer_insurance", "health_savings_accounts"],
+            "canada": ["extended_health_benefits", "provincial_programs"],
+            "united_kingdom": ["private_healthcare_options", "nhs_plus_private"],
+            "australia": ["medicare_plus_private", "mental_health_plans"],
+            "germany": ["statutory_plus_private_insurance"],
+            "sweden": ["regional_healthcare", "private_supplements"],
+            "israel": ["health_fund_coverage", "supplementary_insurance"],
+            "france": ["secu_plus_mutuelle", "professional_health_coverage"]
+        }
+    },
+    "stable_income": {
+        "accessible": ["private_therapy", "specialized_treatment", "wellness_programs", "preventive_care"],
+        "barriers": ["Finding quality providers", "Time management"],
+        "country_resources": {
+            "united_states": ["private_practice", "concierge_medicine"],
+            "united_kingdom": ["private_healthcare", "bupa_services"],
+            "australia": ["private_health_insurance", "specialist_care"],
+            "germany": ["private_insurance_options", "specialist_clinics"],
+            "israel": ["private_health_services", "premium_health_funds"],
+            "france": ["private_practice_options", "premium_mutuelle_coverage"]
+        }
+    }
+}
+
+def _write_json(path: str, document: Any):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def convert_legacy(data_dir: str) -> List[str]:
+    """Split the legacy literals into common.json and one shard per country"""
+    common = {
+        'format_version': FORMAT_VERSION,
+        'age_based_treatments': {
+            age_category: {key: value for key, value in info.items() if key != 'country_specific'}
+            for age_category, info in LEGACY_AGE_BASED_TREATMENTS.items()
+        },
+        'financial_treatment_map': {
+            financial_status: {key: value for key, value in info.items() if key != 'country_resources'}
+            for financial_status, info in LEGACY_FINANCIAL_TREATMENT_MAP.items()
+        }
+    }
+    _write_json(os.path.join(data_dir, COMMON_FILE), common)
+
+    countries = list(LEGACY_COUNTRY_HEALTH_DATA)
+    for country in countries:
+        _write_json(os.path.join(data_dir, SHARD_DIR, f'{country}.json'), {
+            'format_version': FORMAT_VERSION,
+            'country': country,
+            'name': country.replace('_', ' ').title(),
+            'health_data': LEGACY_COUNTRY_HEALTH_DATA[country],
+            'age_treatments': {
+                age_category: info['country_specific'][country]
+                for age_category, info in LEGACY_AGE_BASED_TREATMENTS.items()
+                if country in info.get('country_specific', {})
+            },
+            'financial_resources': {
+                financial_status: info['country_resources'][country]
+                for financial_status, info in LEGACY_FINANCIAL_TREATMENT_MAP.items()
+                if country in info.get('country_resources', {})
+            }
+        })
+
+    return countries
+
+
+def write_manifest(data_dir: str, order: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Summarize every shard into the manifest. Countries keep their current manifest
+    order (or the given order); shards not listed yet are appended alphabetically.
+    """
+    manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+    if order is None:
+        order = []
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                order = list(json.load(f)['countries'])
+
+    shard_dir = os.path.join(data_dir, SHARD_DIR)
+    available = sorted(name[:-len('.json')] for name in os.listdir(shard_dir) if name.endswith('.json'))
+    countries = [country for country in order if country in available]
+    countries += [country for country in available if country not in countries]
+
+    digest = hashlib.sha256()
+    with open(os.path.join(data_dir, COMMON_FILE), 'rb') as f:
+        digest.update(f.read())
+
+    summaries = {}
+    for country in countries:
+        relative_path = f'{SHARD_DIR}/{country}.json'
+        path = os.path.join(data_dir, relative_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+        if shard.get('format_version') != FORMAT_VERSION or shard.get('country') != country:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} shard for {country}")
+
+        sha256 = _file_sha256(path)
+        digest.update(f'{country}:{sha256}'.encode('utf-8'))
+        health_data = shard['health_data']
+        summaries[country] = {
+            'name': shard['name'],
+            'file': relative_path,
+            'sha256': sha256,
+            'crisis_resources': health_data.get('crisis_resources', []),
+            'healthcare_system': health_data.get('healthcare_system', '')
+        }
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'data_version': digest.hexdigest()[:16],
+        'common': COMMON_FILE,
+        'countries': summaries
+    }
+    _write_json(manifest_path, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the country data shards and manifest")
+    parser.add_argument('command', choices=['convert', 'manifest'])
+    parser.add_argument('--data-dir', default=COUNTRY_DATA_DIR, help="Country data directory")
+    args = parser.parse_args(argv)
+
+    order = convert_legacy(args.data_dir) if args.command == 'convert' else None
+    manifest = write_manifest(args.data_dir, order)
+    print(f"Wrote {len(manifest['countries'])} countries (data version {manifest['data_version']}) "
+          f"to {args.data_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
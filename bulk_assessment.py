@@ -0,0 +1,245 @@
+"""
+Bulk assessment helpers for the Global Social Worker web backend
+Parses JSON array and NDJSON caseload payloads into per-item patient records
+and scores large batches of profiles across a process pool
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from compact_profile import CompactProfile
+from socialworkcountry import GlobalSocialWorkerChatbot, PatientProfile
+
+
+class BatchPayloadError(ValueError):
+    """Raised when a batch request body cannot be parsed at all"""
+
+
+class BatchTooLargeError(BatchPayloadError):
+    """Raised when a batch request body holds more records than allowed"""
+
+
+def read_bounded_lines(stream: Any, max_line_length: int) -> Iterator[bytes]:
+    """
+    Yield the lines of a binary stream, reading at most max_line_length + 1 bytes of each.
+    The rest of a longer line is read and dropped, so memory stays bounded however long the
+    stream or its lines are; iter_ndjson_lines reports such lines as too long.
+    """
+    while True:
+        line = stream.readline(max_line_length + 1)
+        if not line:
+            return
+        rest = line
+        while not rest.endswith(b'\n') and len(rest) > max_line_length:
+            rest = stream.readline(max_line_length + 1)
+        yield line
+
+
+def iter_ndjson_lines(lines: Iterable[Any], max_line_length: Optional[int] = None) -> Iterator[Tuple[int, Any, str]]:
+    """
+    Yield (line number, record, error) triples from NDJSON lines, skipping blank lines.
+    A line that is not valid UTF-8 or JSON, or that read_bounded_lines cut off at
+    max_line_length, yields (line number, None, error message) so callers can report
+    it in place instead of failing the whole batch.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if max_line_length is not None and len(line) > max_line_length and line[-1:] not in (b'\n', '\n'):
+            yield line_number, None, f"Line {line_number} is longer than {max_line_length} bytes"
+            continue
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+        except UnicodeDecodeError:
+            yield line_number, None, f"Invalid UTF-8 on line {line_number}"
+            continue
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON on line {line_number}: {e}"
+            continue
+        yield line_number, record, ""
+
+
+def iter_ndjson_records(lines: Iterable[Any], max_line_length: Optional[int] = None) -> Iterator[Tuple[Any, str]]:
+    """Yield (record, error) pairs from NDJSON lines, as iter_ndjson_lines without line numbers"""
+    for _, record, error in iter_ndjson_lines(lines, max_line_length):
+        yield record, error
+
+
+def read_profiles(lines: Iterable[Any]) -> Iterator[Tuple[int, Optional[CompactProfile], str]]:
+    """
+    Yield (line number, profile, error) for every NDJSON record. Records that are not
+    valid JSON or not PatientProfile-shaped (missing or unknown keys) come back with
+    profile None and an error message, so command-line runs report them per line.
+    """
+    for line_number, record, error in iter_ndjson_lines(lines):
+        profile = None
+        if not error:
+            try:
+                profile = CompactProfile.from_record(record)
+            except (TypeError, ValueError) as e:
+                error = f"Invalid profile on line {line_number}: {e}"
+        yield line_number, profile, error
+
+
+def _check_batch_size(count: int, max_records: Optional[int]):
+    if max_records is not None and count > max_records:
+        raise BatchTooLargeError(f"A batch may contain at most {max_records} patient records (got {count})")
+
+
+def parse_batch_payload(body: str, max_records: Optional[int] = None) -> List[Tuple[Any, str]]:
+    """
+    Parse a JSON array or NDJSON body into (record, error) pairs in input order.
+    With max_records, an NDJSON body is refused on its line count before any line is parsed.
+    """
+    text = body.strip()
+
+    if not text:
+        raise BatchPayloadError("Request body is empty")
+
+    if text.startswith('['):
+        try:
+            records = json.loads(text)
+        except ValueError as e:
+            raise BatchPayloadError(f"Invalid JSON array: {e}")
+        _check_batch_size(len(records), max_records)
+        return [(record, "") for record in records]
+
+    lines = text.splitlines()
+    _check_batch_size(sum(1 for line in lines if line.strip()), max_records)
+    return list(iter_ndjson_records(lines))
+
+
+# Per-process chatbot, created once by the pool initializer so every worker
+# loads GlobalHealthDatabase a single time instead of once per task
+_worker_chatbot = None
+
+
+def _init_worker():
+    """Process pool initializer: load the health database for this worker"""
+    global _worker_chatbot
+    _worker_chatbot = GlobalSocialWorkerChatbot()
+
+
+def _assess_profile_chunk(profiles: List[PatientProfile]) -> List[Dict[str, Dict[str, List[str]]]]:
+    """Run the four assessment passes over one chunk of profiles inside a worker"""
+    chatbot = _worker_chatbot
+    return [
+        {
+            'country_health_needs': chatbot.assess_country_specific_health_needs(patient),
+            'country_safety_needs': chatbot.assess_country_specific_safety_needs(patient),
+            'country_evidence_recommendations': chatbot.generate_country_evidence_recommendations(patient),
+            'general_recommendations': chatbot.generate_comprehensive_recommendations(patient)
+        }
+        for patient in profiles
+    ]
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelAssessmentEngine:
+    """
+    Fans batches of PatientProfile objects out to a ProcessPoolExecutor.
+    Profiles are sent in chunks of chunk_size and results come back in input
+    order. Only max_pending chunks are in flight at once, so arbitrarily long
+    iterables are scored with bounded memory.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 256,
+                 max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or self.max_workers * 2
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        return self._executor
+
+    def assess(self, profiles: Iterable[PatientProfile]) -> Iterator[Dict[str, Dict[str, List[str]]]]:
+        """Yield the four assessment passes for every profile, in input order"""
+        executor = self._get_executor()
+        pending = deque()
+
+        for chunk in _chunked(profiles, self.chunk_size):
+            pending.append(executor.submit(_assess_profile_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+    def assess_all(self, profiles: Iterable[PatientProfile]) -> List[Dict[str, Dict[str, List[str]]]]:
+        """Score every profile and return the results as a list"""
+        return list(self.assess(profiles))
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def main(argv=None):
+    """
+    Score an NDJSON file of PatientProfile records and write NDJSON results to stdout.
+    Every non-blank input line produces one output line in input order, labelled with
+    its input line number: the four assessment passes, or {"line": n, "error": ...}.
+    """
+    parser = argparse.ArgumentParser(description="Parallel bulk assessment of PatientProfile records")
+    parser.add_argument('input', help="NDJSON file with one PatientProfile object per line")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=256, help="Profiles sent to a worker per task")
+    args = parser.parse_args(argv)
+
+    def write(line_number, fields):
+        sys.stdout.write(json.dumps(dict(line=line_number, **fields), ensure_ascii=False) + '\n')
+
+    with open(args.input, 'rb') as f:
+        # Entries read so far but not yet written; the engine pulls profiles ahead of its
+        # results, and errors are written as soon as every line before them has been
+        entries = deque()
+
+        def profiles():
+            for entry in read_profiles(f):
+                entries.append(entry)
+                if entry[1] is not None:
+                    yield entry[1]
+
+        with ParallelAssessmentEngine(max_workers=args.workers, chunk_size=args.chunk_size) as engine:
+            for result in engine.assess(profiles()):
+                while entries[0][1] is None:
+                    line_number, _, error = entries.popleft()
+                    write(line_number, {'error': error})
+                write(entries.popleft()[0], result)
+
+        for line_number, _, error in entries:
+            write(line_number, {'error': error})
+
+
+if __name__ == "__main__":
+    main()
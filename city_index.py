@@ -0,0 +1,303 @@
+"""
+Shared city index for the Global Social Worker Chatbot
+One immutable, accent-folded trie per country, built once at import and used by
+both the input validator and the chatbot's city categorization
+"""
+
+import json
+import os
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from country_data import deep_freeze
+
+# Major cities by country; these decide the "major_city" category (read-only, shared)
+MAJOR_CITIES_BY_COUNTRY = deep_freeze({
+    "united_states": ["new york", "los angeles", "chicago", "houston", "phoenix", "philadelphia",
+                      "san antonio", "san diego", "dallas", "san jose", "austin", "jacksonville"],
+    "canada": ["toronto", "montreal", "vancouver", "calgary", "edmonton", "ottawa", "winnipeg"],
+    "united_kingdom": ["london", "birmingham", "manchester", "glasgow", "liverpool", "leeds", "sheffield"],
+    "australia": ["sydney", "melbourne", "brisbane", "perth", "adelaide", "gold coast", "canberra"],
+    "germany": ["berlin", "hamburg", "munich", "cologne", "frankfurt", "stuttgart", "düsseldorf"],
+    "japan": ["tokyo", "osaka", "yokohama", "nagoya", "sapporo", "fukuoka", "kyoto"],
+    "india": ["mumbai", "delhi", "bangalore", "kolkata", "chennai", "hyderabad", "pune"],
+    "brazil": ["são paulo", "rio de janeiro", "brasília", "salvador", "fortaleza", "belo horizonte"],
+    "south_africa": ["johannesburg", "cape town", "durban", "pretoria", "port elizabeth"],
+    "sweden": ["stockholm", "göteborg", "malmö", "uppsala", "västerås", "örebro"],
+    "israel": ["tel aviv", "jerusalem", "haifa", "rishon lezion", "petah tikva", "ashdod", "netanya"],
+    "france": ["paris", "marseille", "lyon", "toulouse", "nice", "nantes", "strasbourg", "montpellier"]
+})
+
+# Optional JSON file of additional known (non-major) cities: {"<country code>": ["<city>", ...]}
+CITY_GAZETTEER_PATH = os.environ.get('CITY_GAZETTEER_PATH', '')
+
+# Letters that have no Unicode decomposition but should still fold to plain Latin
+_FOLD_EXTRA = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th'})
+
+
+def fold_city_name(text: str) -> str:
+    """Casefold and strip accents so "Göteborg", "goteborg" and "GOTEBORG" compare equal"""
+    text = text.strip()
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).translate(_FOLD_EXTRA)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions),
+    computed only in the diagonal band that can stay within max_distance.
+    Returns max_distance + 1 as soon as the distance is known to exceed it.
+    """
+    len_a, len_b = len(a), len(b)
+    over = max_distance + 1
+    if abs(len_a - len_b) > max_distance:
+        return over
+
+    before_previous = None
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+
+    for i in range(1, len_a + 1):
+        ch_a = a[i - 1]
+        current = [over] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            ch_b = b[j - 1]
+            value = previous[j - 1] if ch_a == ch_b else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and ch_a == b[j - 2] and a[i - 2] == ch_b and before_previous[j - 2] + 1 < value:
+                value = before_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > max_distance:
+            return over
+        before_previous, previous = previous, current
+
+    return min(previous[len_b], over)
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """word plus every string obtained by deleting up to max_distance characters from it"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class FuzzyCityMatcher:
+    """
+    Typo-tolerant lookup in the style of SymSpell: every city is indexed under all
+    strings reachable by deleting up to max_distance characters from the first
+    prefix_length characters of its folded name. A query generates the same
+    deletions, so candidates come from a handful of dict lookups and only those
+    are verified with edit_distance. With tens of thousands of cities per country
+    a query stays around a millisecond, against tens of milliseconds for a BK-tree.
+    """
+
+    def __init__(self, cities: Iterable[Tuple[str, str]], max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._keys: List[str] = []
+        self._cities: List[str] = []
+        self._deletes: Dict[str, List[int]] = {}
+
+        for key, city in cities:
+            rank = len(self._keys)
+            self._keys.append(key)
+            self._cities.append(city)
+            for variant in _deletes(key[:prefix_length], max_distance):
+                self._deletes.setdefault(variant, []).append(rank)
+
+    def closest(self, text: str, limit: int = 3, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Up to limit (city, distance) pairs within max_distance, nearest first, then in source order"""
+        key = fold_city_name(text)
+        if not key:
+            return []
+        if max_distance is None:
+            # One edit for short names, where two would match almost anything
+            max_distance = 1 if len(key) <= 4 else self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+
+        candidates = set()
+        for variant in _deletes(key[:self.prefix_length], max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+
+        matches = []
+        for rank in candidates:
+            distance = edit_distance(key, self._keys[rank], max_distance)
+            if distance <= max_distance:
+                matches.append((distance, rank))
+        matches.sort()
+
+        return [(self._cities[rank], distance) for distance, rank in matches[:limit]]
+
+
+class _TrieNode:
+    __slots__ = ('children', 'city', 'major', 'completions')
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.city: Optional[str] = None
+        self.major = False
+        self.completions: List[str] = []
+
+
+class CountryCityIndex:
+    """
+    Trie over the folded names of one country's cities. Exact and prefix lookups
+    cost O(len(name)); each node keeps the cities below it in source order so
+    suggestions need no traversal. The index is read-only once built.
+    """
+
+    def __init__(self, cities: Iterable[Tuple[str, bool]]):
+        self._root = _TrieNode()
+        self.major_cities: Tuple[str, ...] = ()
+        self._size = 0
+        self._fuzzy: Optional[FuzzyCityMatcher] = None
+        self._fuzzy_lock = threading.Lock()
+
+        major_cities = []
+        for city, major in cities:
+            if self._add(city, major) and major:
+                major_cities.append(city)
+        self.major_cities = tuple(major_cities)
+        self._major_set = frozenset(major_cities)
+
+        self._freeze(self._root)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, city: str, major: bool) -> bool:
+        key = fold_city_name(city)
+        if not key:
+            return False
+
+        path = [self._root]
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+            path.append(node)
+
+        if node.city is not None:
+            node.major = node.major or major
+            return False
+
+        node.city = city
+        node.major = major
+        for visited in path:
+            visited.completions.append(city)
+        self._size += 1
+        return True
+
+    def _freeze(self, node: _TrieNode):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current.completions = tuple(current.completions)
+            stack.extend(current.children.values())
+
+    def _walk(self, key: str) -> Tuple[_TrieNode, int]:
+        """Follow key from the root; return the deepest node reached and the matched length"""
+        node = self._root
+        for depth, ch in enumerate(key):
+            child = node.children.get(ch)
+            if child is None:
+                return node, depth
+            node = child
+        return node, len(key)
+
+    def lookup(self, city: str) -> Optional[str]:
+        """Return the canonical name if city is a known city"""
+        key = fold_city_name(city)
+        node, matched = self._walk(key)
+        return node.city if matched == len(key) else None
+
+    def is_prefix(self, text: str, major_only: bool = False) -> bool:
+        """True if text is the beginning of at least one known (major) city name"""
+        key = fold_city_name(text)
+        node, matched = self._walk(key)
+        if not key or matched != len(key):
+            return False
+        # Major cities are added first, so the leading completion tells whether any is major
+        return not major_only or node.completions[0] in self._major_set
+
+    def find_in(self, text: str, major_only: bool = False) -> Optional[str]:
+        """Return the first known city whose name occurs anywhere in text"""
+        key = fold_city_name(text)
+        root_children = self._root.children
+
+        for start in range(len(key)):
+            node = root_children.get(key[start])
+            position = start + 1
+            while node is not None:
+                if node.city is not None and (node.major or not major_only):
+                    return node.city
+                if position == len(key):
+                    break
+                node = node.children.get(key[position])
+                position += 1
+        return None
+
+    def _fuzzy_matcher(self) -> FuzzyCityMatcher:
+        """Build the typo index on first use; most countries never need it"""
+        if self._fuzzy is None:
+            with self._fuzzy_lock:
+                if self._fuzzy is None:
+                    self._fuzzy = FuzzyCityMatcher(
+                        (fold_city_name(city), city) for city in self._root.completions)
+        return self._fuzzy
+
+    def closest(self, text: str, limit: int = 3) -> List[str]:
+        """Cities within a small edit distance of text (typos such as "Mancester"), nearest first"""
+        return [city for city, _ in self._fuzzy_matcher().closest(text, limit)]
+
+    def suggest(self, text: str, limit: int = 3) -> List[str]:
+        """Cities sharing the longest possible prefix with text, in source order"""
+        key = fold_city_name(text)
+        node, matched = self._walk(key)
+        if not matched:
+            return []
+        return list(node.completions[:limit])
+
+
+def _load_gazetteer(path: str) -> Dict[str, List[str]]:
+    """Read the optional gazetteer of additional cities"""
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_city_index(major_cities_by_country: Dict[str, List[str]],
+                     gazetteer: Optional[Dict[str, List[str]]] = None) -> Dict[str, CountryCityIndex]:
+    """Build one index per country; major cities come first so they lead suggestions"""
+    gazetteer = gazetteer or {}
+    countries = list(major_cities_by_country) + [c for c in gazetteer if c not in major_cities_by_country]
+    return {
+        country: CountryCityIndex(
+            [(city, True) for city in major_cities_by_country.get(country, [])] +
+            [(city, False) for city in gazetteer.get(country, [])]
+        )
+        for country in countries
+    }
+
+
+CITY_INDEX = build_city_index(MAJOR_CITIES_BY_COUNTRY, _load_gazetteer(CITY_GAZETTEER_PATH))
+
+
+def city_index_for(country: str) -> Optional[CountryCityIndex]:
+    """The shared index for a country code, or None if no cities are known for it"""
+    return CITY_INDEX.get(country)
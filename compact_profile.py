@@ -0,0 +1,201 @@
+"""
+Compact patient profile for bulk workloads
+CompactProfile holds the same information as PatientProfile in a __slots__ object,
+with the categorical fields stored as small-int enums and country/city interned, so
+hundreds of thousands of profiles fit in a fraction of the memory. It exposes the
+PatientProfile attribute names, so the assessment passes accept it directly; the
+rule engine uses its profile_code instead of building a string key.
+"""
+
+import sys
+from enum import IntEnum
+from typing import Any, Dict, Optional, Union
+
+from recommendation_rules import EMPLOYMENT_STATUSES, EXERCISE_LEVELS, FINANCIAL_STATUSES, MENTAL_STATES
+from socialworkcountry import PatientProfile
+
+GENDERS = ("Male", "Female", "Non-binary", "Prefer not to say")
+
+
+class _Coded(IntEnum):
+    """IntEnum whose values are positions in a label tuple"""
+
+    @property
+    def label(self) -> str:
+        return _LABELS[type(self)][self]
+
+    @classmethod
+    def encode(cls, value: str) -> Union["_Coded", str]:
+        """Enum member for a known label; any other text is kept as is so conversion stays lossless"""
+        code = _CODES[cls].get(value)
+        return cls(code) if code is not None else value
+
+
+# Member values are positions in the matching recommendation_rules domain tuple
+
+class MentalState(_Coded):
+    EXCELLENT = 0
+    GOOD = 1
+    FAIR = 2
+    POOR = 3
+    CRITICAL = 4
+
+
+class FinancialStatus(_Coded):
+    LOW_INCOME = 0
+    MODERATE_INCOME = 1
+    STABLE_INCOME = 2
+
+
+class ExerciseLevel(_Coded):
+    VERY_ACTIVE = 0
+    MODERATELY_ACTIVE = 1
+    LIGHTLY_ACTIVE = 2
+    SEDENTARY = 3
+
+
+class EmploymentStatus(_Coded):
+    FULL_TIME = 0
+    PART_TIME = 1
+    UNEMPLOYED_SEEKING = 2
+    UNEMPLOYED_NOT_SEEKING = 3
+    STUDENT = 4
+    RETIRED = 5
+    UNABLE_TO_WORK = 6
+
+
+class Gender(_Coded):
+    MALE = 0
+    FEMALE = 1
+    NON_BINARY = 2
+    PREFER_NOT_TO_SAY = 3
+
+
+_LABELS = {
+    MentalState: MENTAL_STATES,
+    FinancialStatus: FINANCIAL_STATUSES,
+    ExerciseLevel: EXERCISE_LEVELS,
+    EmploymentStatus: EMPLOYMENT_STATUSES,
+    Gender: GENDERS
+}
+_CODES = {cls: {label: code for code, label in enumerate(labels)} for cls, labels in _LABELS.items()}
+
+# Number of (mental_state, financial_status, exercise_level) combinations; profile_code is
+# the combination's position in itertools.product(MENTAL_STATES, FINANCIAL_STATUSES, EXERCISE_LEVELS)
+PROFILE_COMBINATIONS = len(MENTAL_STATES) * len(FINANCIAL_STATUSES) * len(EXERCISE_LEVELS)
+
+
+def _label(value: Union[_Coded, str]) -> str:
+    return value.label if isinstance(value, _Coded) else value
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CompactProfile:
+    """Slotted, enum-coded equivalent of PatientProfile"""
+
+    __slots__ = ('name', 'age', 'country', 'city', 'gender_code', 'employment_code', 'exercise_code',
+                 'mental_code', 'financial_code', 'additional_notes', 'profile_code')
+
+    def __init__(self, name: str, age: int, country: str, city: str, gender: str, employment_status: str,
+                 exercise_level: str, mental_state: str, financial_status: str, additional_notes: str = ""):
+        self.name = name
+        self.age = age
+        self.country = _intern(country)
+        self.city = _intern(city)
+        self.gender_code = Gender.encode(gender)
+        self.employment_code = EmploymentStatus.encode(employment_status)
+        self.exercise_code = ExerciseLevel.encode(exercise_level)
+        self.mental_code = MentalState.encode(mental_state)
+        self.financial_code = FinancialStatus.encode(financial_status)
+        self.additional_notes = additional_notes
+        self.profile_code = self._profile_code()
+
+    def _profile_code(self) -> Optional[int]:
+        if not (isinstance(self.mental_code, _Coded) and isinstance(self.financial_code, _Coded) and
+                isinstance(self.exercise_code, _Coded)):
+            return None
+        return ((self.mental_code * len(FINANCIAL_STATUSES) + self.financial_code) * len(EXERCISE_LEVELS)
+                + self.exercise_code)
+
+    # PatientProfile attribute names, as read by the assessment passes and display code
+
+    @property
+    def gender(self) -> str:
+        return _label(self.gender_code)
+
+    @property
+    def employment_status(self) -> str:
+        return _label(self.employment_code)
+
+    @property
+    def exercise_level(self) -> str:
+        return _label(self.exercise_code)
+
+    @property
+    def mental_state(self) -> str:
+        return _label(self.mental_code)
+
+    @property
+    def financial_status(self) -> str:
+        return _label(self.financial_code)
+
+    @classmethod
+    def from_patient_profile(cls, patient: PatientProfile) -> "CompactProfile":
+        return cls(patient.name, patient.age, patient.country, patient.city, patient.gender,
+                   patient.employment_status, patient.exercise_level, patient.mental_state,
+                   patient.financial_status, patient.additional_notes)
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "CompactProfile":
+        """Build from a PatientProfile-shaped dict, e.g. one NDJSON line"""
+        return cls(**record)
+
+    def to_patient_profile(self) -> PatientProfile:
+        return PatientProfile(self.name, self.age, self.country, self.city, self.gender, self.employment_status,
+                              self.exercise_level, self.mental_state, self.financial_status, self.additional_notes)
+
+    def _state(self):
+        # Enums become plain ints (free-form text stays a str), which keeps pickles small
+        return (self.name, self.age, self.country, self.city,
+                *(int(value) if isinstance(value, _Coded) else value
+                  for value in (self.gender_code, self.employment_code, self.exercise_code,
+                                self.mental_code, self.financial_code)),
+                self.additional_notes)
+
+    def __reduce__(self):
+        return _restore, self._state()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactProfile):
+            return NotImplemented
+        return self._state() == other._state()
+
+    def __hash__(self) -> int:
+        return hash(self._state())
+
+    def __repr__(self) -> str:
+        return (f"CompactProfile(name={self.name!r}, age={self.age!r}, country={self.country!r}, "
+                f"city={self.city!r}, gender={self.gender!r}, employment_status={self.employment_status!r}, "
+                f"exercise_level={self.exercise_level!r}, mental_state={self.mental_state!r}, "
+                f"financial_status={self.financial_status!r}, additional_notes={self.additional_notes!r})")
+
+
+def _restore(name, age, country, city, gender, employment, exercise, mental, financial, notes) -> CompactProfile:
+    """Unpickle a CompactProfile from its _state() tuple"""
+    decode = lambda cls, value: cls(value) if isinstance(value, int) else value
+    profile = CompactProfile.__new__(CompactProfile)
+    profile.name = name
+    profile.age = age
+    profile.country = _intern(country)
+    profile.city = _intern(city)
+    profile.gender_code = decode(Gender, gender)
+    profile.employment_code = decode(EmploymentStatus, employment)
+    profile.exercise_code = decode(ExerciseLevel, exercise)
+    profile.mental_code = decode(MentalState, mental)
+    profile.financial_code = decode(FinancialStatus, financial)
+    profile.additional_notes = notes
+    profile.profile_code = profile._profile_code()
+    return profile
@@ -0,0 +1,135 @@
+"""
+Response compression for the Global Social Worker web backend
+Negotiates brotli (when the Brotli package is installed) or gzip from Accept-Encoding.
+Dynamic responses are compressed at a fast level once they pass a size threshold;
+static bodies (the index page, reference payloads) are compressed once at the best
+level when they are built and served as they are. Counters cover both paths.
+"""
+
+import gzip
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first; used to break ties between equal q-values
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'image/svg+xml'
+})
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Pick the content coding for an Accept-Encoding header, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(data: bytes, coding: str, best: bool = False) -> bytes:
+    """Compress with a fast setting for dynamic responses, or the best one for bodies built once"""
+    if coding == 'br':
+        return brotli.compress(data, quality=11 if best else 4)
+    if coding == 'gzip':
+        return gzip.compress(data, compresslevel=9 if best else 5, mtime=0)
+    raise ValueError(f"Unsupported content coding: {coding}")
+
+
+class ResponseCompressor:
+    """Compresses bodies and keeps the counters reported by /api/metrics"""
+
+    def __init__(self, min_size: int = 1024, encodings: Iterable[str] = ENCODINGS):
+        self.min_size = min_size
+        self.encodings = tuple(encodings)
+
+        self._lock = threading.Lock()
+        self.compressed = {coding: 0 for coding in self.encodings}
+        self.precompressed_served = {coding: 0 for coding in self.encodings}
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.precompress_cpu_seconds = 0.0
+        self.precompressed_bytes_saved = 0
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        return negotiate(accept_encoding, self.encodings)
+
+    def compress(self, data: bytes, coding: str) -> Optional[bytes]:
+        """Compress a dynamic body, or return None if it is under the threshold or would not shrink"""
+        if len(data) < self.min_size:
+            with self._lock:
+                self.skipped_small += 1
+            return None
+
+        started = time.thread_time()
+        body = compress(data, coding)
+        elapsed = time.thread_time() - started
+
+        with self._lock:
+            self.cpu_seconds += elapsed
+            if len(body) >= len(data):
+                return None
+            self.compressed[coding] += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(body)
+        return body
+
+    def precompress(self, data: bytes) -> Dict[str, bytes]:
+        """Every supported coding of a body that is served many times; empty under the threshold"""
+        if len(data) < self.min_size:
+            return {}
+
+        started = time.thread_time()
+        variants = {coding: compress(data, coding, best=True) for coding in self.encodings}
+        elapsed = time.thread_time() - started
+
+        with self._lock:
+            self.precompress_cpu_seconds += elapsed
+        return {coding: body for coding, body in variants.items() if len(body) < len(data)}
+
+    def served_precompressed(self, coding: str, identity_size: int, compressed_size: int):
+        with self._lock:
+            self.precompressed_served[coding] += 1
+            self.precompressed_bytes_saved += identity_size - compressed_size
+
+    def stats(self) -> Dict[str, Any]:
+        """Compression counters for /api/metrics"""
+        with self._lock:
+            return {
+                'encodings': list(self.encodings),
+                'min_size': self.min_size,
+                'compressed': dict(self.compressed),
+                'skipped_small': self.skipped_small,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+                'cpu_seconds': round(self.cpu_seconds, 6),
+                'precompressed_served': dict(self.precompressed_served),
+                'precompressed_bytes_saved': self.precompressed_bytes_saved,
+                'precompress_cpu_seconds': round(self.precompress_cpu_seconds, 6)
+            }
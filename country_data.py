@@ -0,0 +1,151 @@
+"""
+Versioned, lazily loaded country data for the Global Social Worker Chatbot
+The health database lives in data/: a manifest with the data version and a small
+summary per country, common.json with the country-independent treatment data, and
+one shard per country under data/countries/. Shards are read on first access and
+kept in a bounded LRU cache, so startup cost does not grow with the country count.
+Everything read from disk is frozen (read-only mappings, tuples, frozensets): shards
+are shared between threads and, under gunicorn, between forked workers.
+Use build_country_shards.py to regenerate the manifest after editing a shard.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+FORMAT_VERSION = 1
+
+COUNTRY_DATA_DIR = os.environ.get(
+    'COUNTRY_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+COUNTRY_SHARD_CACHE_SIZE = int(os.environ.get('COUNTRY_SHARD_CACHE_SIZE', 64))
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class CountryDataError(ValueError):
+    """Raised when the manifest or a shard is missing, unsupported or out of date"""
+
+
+def _read_json(path: str) -> Tuple[Any, bytes]:
+    """Return the parsed document and the raw bytes it was read from"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return json.loads(raw.decode('utf-8')), raw
+
+
+def deep_freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings, lists to tuples and sets to frozensets"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: deep_freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(deep_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(deep_freeze(item) for item in value)
+    return value
+
+
+class CountryDataStore:
+    """Reads the manifest eagerly and country shards on demand"""
+
+    def __init__(self, data_dir: str = COUNTRY_DATA_DIR, cache_size: int = COUNTRY_SHARD_CACHE_SIZE):
+        self.data_dir = data_dir
+        self.cache_size = cache_size
+
+        manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+        try:
+            manifest, _ = _read_json(manifest_path)
+        except OSError as e:
+            raise CountryDataError(f"Country data manifest not found at {manifest_path}: {e}")
+
+        if manifest.get('format_version') != FORMAT_VERSION:
+            raise CountryDataError(f"{manifest_path} is not a version {FORMAT_VERSION} country data manifest")
+
+        self.data_version: str = manifest['data_version']
+        self._summaries: Mapping[str, Mapping[str, Any]] = deep_freeze(manifest['countries'])
+        self.countries: Tuple[str, ...] = tuple(self._summaries)
+        common, _ = _read_json(os.path.join(data_dir, manifest['common']))
+        self.common: Mapping[str, Any] = deep_freeze(common)
+
+        self._shards: "OrderedDict[str, Mapping[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def __contains__(self, country: str) -> bool:
+        return country in self._summaries
+
+    def summary(self, country: str) -> Mapping[str, Any]:
+        """Manifest summary for a country (name, crisis resources, healthcare system) without loading its shard"""
+        return self._summaries[country]
+
+    def shard(self, country: str) -> Mapping[str, Any]:
+        """Return a country's shard, reading it from disk if it is not cached"""
+        with self._lock:
+            shard = self._shards.get(country)
+            if shard is not None:
+                self._shards.move_to_end(country)
+                return shard
+
+        summary = self._summaries[country]
+        shard, raw = _read_json(os.path.join(self.data_dir, summary['file']))
+        if hashlib.sha256(raw).hexdigest() != summary['sha256']:
+            raise CountryDataError(f"Shard for {country} does not match the manifest; rerun build_country_shards.py")
+        shard = deep_freeze(shard)
+
+        with self._lock:
+            self.loads += 1
+            self._shards[country] = shard
+            self._shards.move_to_end(country)
+            while len(self._shards) > self.cache_size:
+                self._shards.popitem(last=False)
+        return shard
+
+    def stats(self) -> Dict[str, Any]:
+        """Shard cache counters"""
+        with self._lock:
+            return {
+                'data_version': self.data_version,
+                'countries': len(self.countries),
+                'cached_shards': len(self._shards),
+                'cache_size': self.cache_size,
+                'shard_loads': self.loads
+            }
+
+
+class CountryShardMapping(Mapping):
+    """
+    Read-only country -> value mapping backed by the shards, e.g. country_health_data
+    or the per-country treatments of one age category. Lookups load a single shard;
+    iterating a keyed section has to load every shard.
+    """
+
+    def __init__(self, store: CountryDataStore, section: str, key: Optional[str] = None):
+        self._store = store
+        self._section = section
+        self._key = key
+
+    def __getitem__(self, country: str) -> Any:
+        if country not in self._store:
+            raise KeyError(country)
+        value = self._store.shard(country)[self._section]
+        return value if self._key is None else value[self._key]
+
+    def __contains__(self, country: object) -> bool:
+        if self._key is None:
+            return country in self._store
+        return super().__contains__(country)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._key is None:
+            return iter(self._store.countries)
+        return (country for country in self._store.countries
+                if self._key in self._store.shard(country)[self._section])
+
+    def __len__(self) -> int:
+        if self._key is None:
+            return len(self._store.countries)
+        return sum(1 for _ in self)
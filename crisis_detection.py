@@ -0,0 +1,187 @@
+"""
+Crisis-language detection shared by risk scoring and input validation
+Per-language lexicons are folded (NFKD, accents stripped, casefolded) and compiled
+into a single trie-shaped pattern, so the notes are scanned once whatever the number
+of phrases and languages. Matches are reported with their category, language and
+span in the original, unnormalized text.
+"""
+
+import bisect
+import itertools
+import re
+import unicodedata
+from typing import Dict, FrozenSet, List, NamedTuple, Set, Tuple
+
+# Categories that make a note a crisis for risk scoring; hopelessness is a warning only
+CRISIS_CATEGORIES = frozenset({"self_harm", "suicidal_intent"})
+
+# language -> (phrases need word boundaries, {category: phrases}). Phrases are written
+# naturally and folded at compile time; a trailing * matches any word ending
+# ("suicid*" covers suicide, suicidal, suicidio). Japanese has no spaces and Hebrew
+# attaches prefixes to words, so their phrases match anywhere.
+LEXICONS: Dict[str, Tuple[bool, Dict[str, Tuple[str, ...]]]] = {
+    "en": (True, {
+        "self_harm": ("kill myself", "kill self", "die myself", "die self", "suicide myself", "suicide self",
+                      "harm myself", "harm self", "hurt myself", "hurt self", "cut myself", "self-harm",
+                      "self harm"),
+        "suicidal_intent": ("suicid*", "want to die", "end it all", "end my life", "take my own life",
+                            "better off dead"),
+        "hopelessness": ("no point", "give up", "hopeless*")
+    }),
+    "fr": (True, {
+        "self_harm": ("me tuer", "me faire du mal", "me blesser", "me mutiler"),
+        "suicidal_intent": ("suicid*", "me suicider", "veux mourir", "envie de mourir", "en finir"),
+        "hopelessness": ("sans espoir", "plus d'espoir", "ça ne sert à rien", "à quoi bon", "abandonner")
+    }),
+    "de": (True, {
+        "self_harm": ("mich umbringen", "mir weh tun", "mir wehtun", "mich verletzen", "mich ritzen"),
+        "suicidal_intent": ("suizid*", "selbstmord*", "will sterben", "möchte sterben", "mir das leben nehmen",
+                            "nicht mehr leben"),
+        "hopelessness": ("hoffnungslos*", "keinen sinn mehr", "aufgeben")
+    }),
+    "pt": (True, {
+        "self_harm": ("me matar", "me machucar", "me ferir", "me cortar"),
+        "suicidal_intent": ("suicíd*", "suicid*", "quero morrer", "acabar com tudo", "tirar minha vida"),
+        "hopelessness": ("sem esperança", "não aguento mais", "desistir")
+    }),
+    "sv": (True, {
+        "self_harm": ("skada mig själv", "ta livet av mig"),
+        "suicidal_intent": ("självmord*", "vill dö", "vill inte leva"),
+        "hopelessness": ("hopplös*", "ingen mening", "ge upp")
+    }),
+    "he": (False, {
+        "self_harm": ("להרוג את עצמי", "לפגוע בעצמי", "לפגוע בעצמה"),
+        "suicidal_intent": ("להתאבד", "התאבדות", "רוצה למות", "לשים קץ לחיי"),
+        "hopelessness": ("אין טעם", "אין תקווה", "חסר תקווה", "חסרת תקווה")
+    }),
+    "ja": (False, {
+        "self_harm": ("自分を傷つけ", "自傷", "リストカット"),
+        "suicidal_intent": ("自殺", "死にたい", "消えたい", "命を絶"),
+        "hopelessness": ("生きる意味がない", "絶望", "もう限界")
+    })
+}
+
+_FOLD_EXTRA = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ł': 'l', 'đ': 'd', 'ð': 'd', 'þ': 'th'})
+
+
+class _FoldTable(dict):
+    """
+    str.translate table folding each character (NFKD, casefold, accents dropped),
+    filled in on first sight of a character. Characters whose folded form is not
+    exactly one character are remembered in reshaping, as they shift offsets.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reshaping = set()
+
+    def __missing__(self, code_point: int) -> str:
+        decomposed = unicodedata.normalize('NFKD', chr(code_point).casefold())
+        folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).translate(_FOLD_EXTRA)
+        if len(folded) != 1:
+            self.reshaping.add(chr(code_point))
+        self[code_point] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def fold_text(text: str) -> Tuple[str, List[str]]:
+    """
+    Folded text, plus the folded piece of every original character when folding
+    changed the length of any of them (otherwise offsets carry over unchanged)
+    """
+    if text.isascii():
+        return text.lower(), []
+    folded = text.translate(_FOLD_TABLE)
+    if _FOLD_TABLE.reshaping.isdisjoint(text):
+        return folded, []
+    return folded, [_FOLD_TABLE[ord(ch)] for ch in text]
+
+
+class CrisisMatch(NamedTuple):
+    """One hit: category, lexicon language, lexicon phrase and span in the original text"""
+    category: str
+    language: str
+    phrase: str
+    start: int
+    end: int
+
+
+class CrisisLanguageDetector:
+    """
+    Compiles the lexicons into one pattern. Every phrase becomes a path in a trie and
+    ends in an empty named group, so match.lastgroup identifies the phrase without a
+    second lookup pass; at each position the longest phrase wins.
+    """
+
+    def __init__(self, lexicons: Dict[str, Tuple[bool, Dict[str, Tuple[str, ...]]]] = LEXICONS):
+        self.phrases: List[Tuple[str, str, str]] = []
+        tries = {True: {}, False: {}}
+        seen: Dict[Tuple[bool, str], int] = {}
+
+        for language, (bounded, categories) in lexicons.items():
+            for category, phrases in categories.items():
+                for phrase in phrases:
+                    wildcard = phrase.endswith('*')
+                    folded, _ = fold_text(phrase.rstrip('*'))
+                    tokens = [' ' if ch.isspace() else ch for ch in folded]
+                    key = (bounded, ''.join(tokens) + ('*' if wildcard else ''))
+                    if key in seen:
+                        continue
+                    seen[key] = phrase_id = len(self.phrases)
+                    self.phrases.append((category, language, phrase))
+
+                    node = tries[bounded]
+                    for token in tokens:
+                        node = node.setdefault(token, {})
+                    if wildcard:
+                        ending = rf'\w*(?P<p{phrase_id}>)'
+                    elif bounded:
+                        ending = rf'(?!\w)(?P<p{phrase_id}>)'
+                    else:
+                        ending = rf'(?P<p{phrase_id}>)'
+                    node.setdefault('', []).append(ending)
+
+        # Every top-level branch starts with a literal, which lets the regex engine skip
+        # ahead to possible first characters; the word-boundary check for bounded phrases
+        # is a lookbehind past that first character
+        branches = [re.escape(token) + r'(?<!\w.)' + self._pattern(child) for token, child in sorted(tries[True].items())]
+        branches += [re.escape(token) + self._pattern(child) for token, child in sorted(tries[False].items())]
+        self.pattern = re.compile('|'.join(branches) or r'(?!)')
+
+    @classmethod
+    def _pattern(cls, node: Dict) -> str:
+        """Regex for a trie node: longer continuations are tried before phrases ending here"""
+        branches = [(r'\s+' if token == ' ' else re.escape(token)) + cls._pattern(child)
+                    for token, child in sorted(node.items()) if token != '']
+        branches.extend(node.get('', []))
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    def find(self, text: str) -> List[CrisisMatch]:
+        """Every non-overlapping hit in text, in order"""
+        if not text:
+            return []
+        folded, pieces = fold_text(text)
+        matches = [(match.lastgroup, match.start(), match.end()) for match in self.pattern.finditer(folded)]
+        if not matches:
+            return []
+
+        if pieces:
+            # Map folded offsets back through the end offset of each original character
+            ends = list(itertools.accumulate(len(piece) for piece in pieces))
+            matches = [(group, bisect.bisect_right(ends, start), bisect.bisect_right(ends, end - 1) + 1)
+                       for group, start, end in matches]
+
+        return [CrisisMatch(*self.phrases[int(group[1:])], start, end) for group, start, end in matches]
+
+    def categories(self, text: str) -> Set[str]:
+        return {match.category for match in self.find(text)}
+
+    def is_crisis(self, text: str, crisis_categories: FrozenSet[str] = CRISIS_CATEGORIES) -> bool:
+        """True when the text contains self-harm or suicidal-intent language"""
+        return any(match.category in crisis_categories for match in self.find(text))
+
+
+CRISIS_DETECTOR = CrisisLanguageDetector()
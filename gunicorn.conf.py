@@ -0,0 +1,58 @@
+"""
+gunicorn settings for the web backend
+Start with: gunicorn -c gunicorn.conf.py wsgi:app
+Worker processes, threads and timeouts are tunable through the environment.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Forked processes each running a thread pool; threads overlap slow clients and I/O,
+# processes give CPU-bound assessment work more than one core
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import wsgi (health data, rules, validator) once in the master before forking;
+# GUNICORN_PRELOAD=0 imports it in every worker instead
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers after this many requests (0 disables), jittered so they do not all restart at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+
+# Needed for zero-downtime upgrades with USR2 (see README)
+pidfile = os.environ.get('GUNICORN_PID_FILE') or None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    """Freeze whatever the master allocated since wsgi.warm_up, e.g. before a reload re-forks"""
+    if preload_app:
+        from wsgi import GC_FREEZE  # already imported by the preload
+
+        if GC_FREEZE:
+            gc.freeze()
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} started from the preloaded application")
+
+
+def worker_exit(server, worker):
+    """Write out queued saves and the buffered audit log block before a worker goes away"""
+    from web_backend import web_chatbot
+
+    web_chatbot.save_queue.close()
+    if web_chatbot.assessment_log is not None:
+        web_chatbot.assessment_log.close()
@@ -0,0 +1,167 @@
+"""
+HTTP caching helpers for the Global Social Worker web backend
+Templates static pages once and keeps them in memory with their validators, and
+serializes reference API payloads once per health database version. Both can also
+keep compressed variants of each body, made once when the body is built.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from serialization import encode_json
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """A rendered page together with the validators used for conditional requests"""
+    body: bytes
+    etag: str
+    last_modified: Optional[float]
+    # Content coding ("br", "gzip") -> compressed body
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+
+class IndexPageRenderer:
+    """
+    Loads client.html once and templates it once per API base URL.
+    The source file is re-read only when its mtime changes; the stat call
+    itself is throttled to once per check_interval seconds.
+    """
+
+    def __init__(self, candidate_paths: List[str], transform: Callable[[str, str], str],
+                 check_interval: float = 1.0, max_variants: int = 16,
+                 precompress: Optional[Callable[[bytes], Dict[str, bytes]]] = None):
+        self.candidate_paths = candidate_paths
+        self.transform = transform
+        self.precompress = precompress
+        self.check_interval = check_interval
+        self.max_variants = max_variants
+
+        self.path: Optional[str] = None
+        self._source: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._pages: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _resolve_path(self) -> str:
+        """Return the first candidate path that exists"""
+        for path in self.candidate_paths:
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError("client.html not found in any expected location")
+
+    def _refresh(self):
+        """Reload the source file if it moved or its mtime changed"""
+        now = time.monotonic()
+        if self._source is not None and now - self._last_check < self.check_interval:
+            return
+
+        try:
+            path = self.path or self._resolve_path()
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            path = self._resolve_path()
+            mtime = os.stat(path).st_mtime
+
+        if path != self.path or mtime != self._mtime:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._source = f.read()
+            self.path = path
+            self._mtime = mtime
+            self._pages.clear()
+
+        self._last_check = now
+
+    def render(self, api_base_url: str) -> CachedPage:
+        """Return the cached page for this API base URL, templating it on first use"""
+        with self._lock:
+            self._refresh()
+
+            page = self._pages.get(api_base_url)
+            if page is not None:
+                self._pages.move_to_end(api_base_url)
+                return page
+
+            body = self.transform(self._source, api_base_url).encode('utf-8')
+            page = CachedPage(
+                body=body,
+                etag=hashlib.sha256(body).hexdigest()[:32],
+                last_modified=self._mtime,
+                variants=self.precompress(body) if self.precompress is not None else {}
+            )
+
+            # The host header is client controlled, so keep the number of variants bounded
+            self._pages[api_base_url] = page
+            if len(self._pages) > self.max_variants:
+                self._pages.popitem(last=False)
+
+            return page
+
+
+class ReferencePayloadCache:
+    """
+    Reference API payloads (country list, emergency resources, bootstrap bundle)
+    serialized once per data version with serialization.encode_json, the encoder
+    behind jsonify, so a cached body matches a freshly built response. ETags are strong and start with the data
+    version, so a new health database invalidates every cached client copy.
+    Builders return None for keys that do not exist; those are not cached.
+    """
+
+    def __init__(self, data_version: Callable[[], str],
+                 precompress: Optional[Callable[[bytes], Dict[str, bytes]]] = None):
+        self.data_version = data_version
+        self.precompress = precompress
+
+        self._version: Optional[str] = None
+        self._payloads: Dict[str, CachedPage] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, key: str, build: Callable[[], Any]) -> Optional[CachedPage]:
+        """Return the cached payload for key, building and encoding it on first use"""
+        version = self.data_version()
+        with self._lock:
+            if version != self._version:
+                self._payloads.clear()
+                self._version = version
+            page = self._payloads.get(key)
+            if page is not None:
+                self.hits += 1
+                return page
+
+        payload = build()
+        if payload is None:
+            return None
+
+        body = encode_json(payload)
+        page = CachedPage(
+            body=body,
+            etag=f"{version}-{hashlib.sha256(body).hexdigest()[:16]}",
+            last_modified=None,
+            variants=self.precompress(body) if self.precompress is not None else {}
+        )
+        with self._lock:
+            if version == self._version:
+                self.builds += 1
+                page = self._payloads.setdefault(key, page)
+        return page
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for /api/metrics"""
+        with self._lock:
+            return {
+                'data_version': self._version,
+                'payloads': len(self._payloads),
+                'bytes': sum(len(page.body) for page in self._payloads.values()),
+                'compressed_bytes': sum(len(body) for page in self._payloads.values()
+                                        for body in page.variants.values()),
+                'hits': self.hits,
+                'builds': self.builds
+            }
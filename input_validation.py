@@ -4,6 +4,16 @@ import json
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional, Union
 
+from types import MappingProxyType
+
+from city_index import MAJOR_CITIES_BY_COUNTRY, city_index_for
+from crisis_detection import CRISIS_DETECTOR
+
+# Patterns are compiled once at import; the validators run on every keystroke from the web client
+_NAME_INVALID_CHARS = re.compile(r'[<>{}[\]\\|`~!@#$%^&*()+=]')
+_NAME_FORMAT = re.compile(r'^[A-Za-z\s\.\-\']+$')
+_CITY_FORMAT = re.compile(r'^[A-Za-z\s\.\-\'àáâãäåæçèéêëìíîïñòóôõöøùúûüýÿ]+$')
+
 
 @dataclass
 class ValidationResult:
@@ -22,7 +32,7 @@ class GlobalInputValidator:
     """Comprehensive input validation system for the Global Social Worker Chatbot"""
 
     def __init__(self):
-        self.country_options = {
+        self.country_options = MappingProxyType({
             "1": ("united_states", "United States"),
             "2": ("canada", "Canada"),
             "3": ("united_kingdom", "United Kingdom"),
@@ -35,24 +45,10 @@ class GlobalInputValidator:
             "10": ("sweden", "Sweden"),
             "11": ("israel", "Israel"),
             "12": ("france", "France")
-        }
+        })
 
-        # Common city names by country for validation assistance
-        self.major_cities_by_country = {
-            "united_states": ["new york", "los angeles", "chicago", "houston", "phoenix", "philadelphia",
-                              "san antonio", "san diego", "dallas", "san jose", "austin", "jacksonville"],
-            "canada": ["toronto", "montreal", "vancouver", "calgary", "edmonton", "ottawa", "winnipeg"],
-            "united_kingdom": ["london", "birmingham", "manchester", "glasgow", "liverpool", "leeds", "sheffield"],
-            "australia": ["sydney", "melbourne", "brisbane", "perth", "adelaide", "gold coast", "canberra"],
-            "germany": ["berlin", "hamburg", "munich", "cologne", "frankfurt", "stuttgart", "düsseldorf"],
-            "japan": ["tokyo", "osaka", "yokohama", "nagoya", "sapporo", "fukuoka", "kyoto"],
-            "india": ["mumbai", "delhi", "bangalore", "kolkata", "chennai", "hyderabad", "pune"],
-            "brazil": ["são paulo", "rio de janeiro", "brasília", "salvador", "fortaleza", "belo horizonte"],
-            "south_africa": ["johannesburg", "cape town", "durban", "pretoria", "port elizabeth"],
-            "sweden": ["stockholm", "göteborg", "malmö", "uppsala", "västerås", "örebro"],
-            "israel": ["tel aviv", "jerusalem", "haifa", "rishon lezion", "petah tikva", "ashdod", "netanya"],
-            "france": ["paris", "marseille", "lyon", "toulouse", "nice", "nantes", "strasbourg", "montpellier"]
-        }
+        # Common city names by country for validation assistance (shared, read-only)
+        self.major_cities_by_country = MAJOR_CITIES_BY_COUNTRY
 
     def validate_name(self, name: str) -> ValidationResult:
         """Validate patient name or initials"""
@@ -75,7 +71,7 @@ class GlobalInputValidator:
             )
 
         # Check for potentially invalid characters
-        if re.search(r'[<>{}[\]\\|`~!@#$%^&*()+=]', name):
+        if _NAME_INVALID_CHARS.search(name):
             return ValidationResult(
                 is_valid=False,
                 value=None,
@@ -84,7 +80,7 @@ class GlobalInputValidator:
             )
 
         # Check for reasonable name pattern
-        if re.match(r'^[A-Za-z\s\.\-\']+$', name):
+        if _NAME_FORMAT.match(name):
             return ValidationResult(is_valid=True, value=name)
 
         return ValidationResult(
@@ -202,7 +198,7 @@ class GlobalInputValidator:
             )
 
         # Check for valid city name characters
-        if not re.match(r'^[A-Za-z\s\.\-\'àáâãäåæçèéêëìíîïñòóôõöøùúûüýÿ]+$', city_input):
+        if not _CITY_FORMAT.match(city_input):
             return ValidationResult(
                 is_valid=False,
                 value=None,
@@ -213,21 +209,20 @@ class GlobalInputValidator:
         suggestions = []
 
         # Provide suggestions if country is known
-        if country_code and country_code in self.major_cities_by_country:
-            city_lower = city_input.lower()
-            major_cities = self.major_cities_by_country[country_code]
-
-            # Check if it's a major city
-            for major_city in major_cities:
-                if major_city in city_lower or city_lower in major_city:
-                    suggestions.append(f"Recognized as major city in {country_code.replace('_', ' ').title()}")
-                    break
+        index = city_index_for(country_code) if country_code else None
+        if index is not None:
+            country_name = country_code.replace('_', ' ').title()
+
+            # Recognized if the input contains a known city or is the start of one
+            if index.find_in(city_input, major_only=True) or index.is_prefix(city_input, major_only=True):
+                suggestions.append(f"Recognized as major city in {country_name}")
+            elif index.find_in(city_input) or index.is_prefix(city_input):
+                suggestions.append(f"Recognized city in {country_name}")
             else:
-                # Suggest similar cities
-                similar_cities = [city for city in major_cities if city[0].lower() == city_lower[0].lower()]
+                # Suggest the closest spellings, falling back to cities sharing a prefix with the input
+                similar_cities = index.closest(city_input) or index.suggest(city_input)
                 if similar_cities:
-                    suggestions.append(
-                        f"Similar cities in {country_code.replace('_', ' ').title()}: {', '.join(similar_cities[:3])}")
+                    suggestions.append(f"Similar cities in {country_name}: {', '.join(similar_cities)}")
 
         return ValidationResult(is_valid=True, value=city_input, suggestions=suggestions)
 
@@ -527,20 +522,16 @@ class GlobalInputValidator:
             )
 
         # Check for potentially problematic content
-        concerning_patterns = [
-            r'\b(kill|die|suicide|harm|hurt)\s+(myself|self)\b',
-            r'\b(want\s+to\s+die|end\s+it\s+all)\b',
-            r'\b(no\s+point|give\s+up|hopeless)\b'
-        ]
-
         suggestions = []
-        for pattern in concerning_patterns:
-            if re.search(pattern, notes_input.lower()):
-                suggestions.append("⚠️ Note contains concerning language - prioritize immediate assessment")
-                break
+        if self.find_crisis_language(notes_input):
+            suggestions.append("⚠️ Note contains concerning language - prioritize immediate assessment")
 
         return ValidationResult(is_valid=True, value=notes_input, suggestions=suggestions)
 
+    def find_crisis_language(self, text: str) -> List[Tuple[str, Tuple[int, int]]]:
+        """Scan text once and return (category, span) for every crisis-language hit, in any supported language"""
+        return [(match.category, (match.start, match.end)) for match in CRISIS_DETECTOR.find(text)]
+
     def validate_yes_no_input(self, input_str: str, question_context: str = "") -> ValidationResult:
         """Validate yes/no responses"""
         input_str = input_str.strip().lower()
@@ -0,0 +1,408 @@
+"""
+Declarative recommendation rules for the Global Social Worker Chatbot
+The rule tables below are compiled once per GlobalHealthDatabase into an index keyed by
+(country, age_category, mental_state, financial_status, exercise_level), so an assessment
+only visits the rules that can fire for that profile
+"""
+
+import itertools
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+# Value domains of the indexed profile dimensions
+AGE_CATEGORIES = ("young_adult", "adult", "middle_aged", "senior")
+MENTAL_STATES = ("Excellent", "Good", "Fair", "Poor", "Critical")
+FINANCIAL_STATUSES = ("low_income", "moderate_income", "stable_income")
+EXERCISE_LEVELS = ("Very active", "Moderately active", "Lightly active", "Sedentary")
+EMPLOYMENT_STATUSES = ("Full-time employed", "Part-time employed", "Unemployed - actively seeking",
+                       "Unemployed - not seeking", "Student", "Retired", "Unable to work")
+
+# Output categories of each assessment pass, in the order they are reported
+SECTION_CATEGORIES = {
+    "health_needs": ("country_priority_health_issues", "preventive_care_country_specific",
+                     "mental_health_cultural_considerations", "healthcare_system_navigation"),
+    "safety_needs": ("crisis_resources_local", "cultural_safety_considerations",
+                     "country_specific_risks", "social_support_systems"),
+    "evidence": ("Country-Specific Treatment Options", "Healthcare System Navigation",
+                 "Cultural Treatment Adaptations", "Financial Access Strategies"),
+    "general": ("Physical Health", "Mental Health", "Social/Professional", "Daily Structure", "Crisis Support")
+}
+
+SEVERE_MENTAL_STATES = frozenset({"Poor", "Critical"})
+
+_AGE_CODES = {age_category: code for code, age_category in enumerate(AGE_CATEGORIES)}
+_PROFILE_COMBINATIONS = len(MENTAL_STATES) * len(FINANCIAL_STATUSES) * len(EXERCISE_LEVELS)
+
+
+class AnyExcept:
+    """Condition matching every value except the listed ones"""
+
+    def __init__(self, *values: str):
+        self.values = frozenset(values)
+
+    def __contains__(self, value: str) -> bool:
+        return value not in self.values
+
+
+Condition = Optional[Union[FrozenSet[str], AnyExcept]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One recommendation: when every condition holds, message is added to category of section.
+    countries and country_condition are resolved at compile time against the country's data;
+    employment_keyword is the only condition checked per assessment.
+    """
+    section: str
+    category: str
+    message: str
+    countries: Condition = None
+    age_categories: Condition = None
+    mental_states: Condition = None
+    financial_statuses: Condition = None
+    exercise_levels: Condition = None
+    employment_keyword: Optional[str] = None
+    country_condition: Optional[Callable[[Dict[str, Any]], bool]] = None
+    rule_id: int = -1
+
+    def matches_profile(self, age_category: str, mental_state: str, financial_status: str,
+                        exercise_level: str) -> bool:
+        """Check the indexed, non-country conditions"""
+        return ((self.age_categories is None or age_category in self.age_categories) and
+                (self.mental_states is None or mental_state in self.mental_states) and
+                (self.financial_statuses is None or financial_status in self.financial_statuses) and
+                (self.exercise_levels is None or exercise_level in self.exercise_levels))
+
+
+def _values(*values: str) -> FrozenSet[str]:
+    return frozenset(values)
+
+
+def _has_health_issue(issue: str) -> Callable[[Dict[str, Any]], bool]:
+    return lambda data: issue in data.get("common_health_issues", [])
+
+
+def _has_cultural_factor(factor: str) -> Callable[[Dict[str, Any]], bool]:
+    return lambda data: factor in data.get("cultural_considerations", [])
+
+
+def _healthcare_system_is(system: str) -> Callable[[Dict[str, Any]], bool]:
+    return lambda data: data.get("healthcare_system", "") == system
+
+
+def _has_crisis_resources(data: Dict[str, Any]) -> bool:
+    return bool(data.get("crisis_resources", []))
+
+
+# Rules produced from the country's own data lists. Each receives
+# (country_code, country_data, health_db) and yields fully rendered rules.
+
+def _screening_rules(country, data, health_db):
+    for issue in data.get("common_health_issues", [])[:3]:
+        yield Rule("health_needs", "country_priority_health_issues", f"Screen for {issue.replace('_', ' ')}")
+
+
+def _cultural_consideration_rules(country, data, health_db):
+    for factor in data.get("cultural_considerations", []):
+        rule = CULTURAL_CONSIDERATION_RULES.get(factor)
+        if rule is not None:
+            yield rule
+
+
+def _preventive_care_rules(country, data, health_db):
+    for focus in data.get("preventive_care_focus", []):
+        yield Rule("health_needs", "preventive_care_country_specific", focus.replace('_', ' ').title())
+
+
+def _local_crisis_resource_rules(country, data, health_db):
+    for resource in data.get("crisis_resources", []):
+        yield Rule("safety_needs", "crisis_resources_local", f"Emergency: {resource}",
+                   mental_states=SEVERE_MENTAL_STATES)
+
+
+def _age_treatment_rules(country, data, health_db):
+    country_name = country.replace('_', ' ').title()
+    for age_category in AGE_CATEGORIES:
+        treatments = health_db.age_based_treatments[age_category].get("country_specific", {}).get(country, [])
+        if treatments:
+            yield Rule("evidence", "Country-Specific Treatment Options",
+                       f"Recommended for {age_category} in {country_name}: {', '.join(treatments)}",
+                       age_categories=_values(age_category))
+
+
+def _financial_access_rules(country, data, health_db):
+    country_name = country.replace('_', ' ').title()
+    for financial_status, treatment_info in health_db.financial_treatment_map.items():
+        resources = treatment_info.get("country_resources", {}).get(country, [])
+        if resources:
+            yield Rule("evidence", "Financial Access Strategies",
+                       f"Available in {country_name}: {', '.join(resources)}",
+                       financial_statuses=_values(financial_status))
+
+
+CULTURAL_CONSIDERATION_RULES = {
+    "mental_health_stigma": Rule("health_needs", "mental_health_cultural_considerations",
+                                 "Address cultural stigma around mental health treatment",
+                                 mental_states=_values("Fair", "Poor", "Critical")),
+    "family_centered_care": Rule("health_needs", "mental_health_cultural_considerations",
+                                 "Include family in treatment planning when appropriate"),
+    "work_stress": Rule("health_needs", "mental_health_cultural_considerations",
+                        "Address work-related stress common in this cultural context",
+                        employment_keyword="employed")
+}
+
+HEALTH_NEEDS_RULES = [
+    _screening_rules,
+    Rule("health_needs", "mental_health_cultural_considerations",
+         "Mental health affects {mental_health_prevalence:.0f}% of population in {country_name}",
+         mental_states=SEVERE_MENTAL_STATES),
+    _cultural_consideration_rules,
+    Rule("health_needs", "healthcare_system_navigation",
+         "Assist with insurance navigation and coverage verification",
+         country_condition=_healthcare_system_is("private_insurance")),
+    Rule("health_needs", "healthcare_system_navigation",
+         "Connect with publicly funded health services",
+         country_condition=_healthcare_system_is("universal_healthcare")),
+    Rule("health_needs", "healthcare_system_navigation",
+         "Evaluate best public vs. private options based on needs and finances",
+         country_condition=_healthcare_system_is("mixed_public_private")),
+    _preventive_care_rules
+]
+
+SAFETY_NEEDS_RULES = [
+    _local_crisis_resource_rules,
+    Rule("safety_needs", "country_specific_risks", "Violence-related trauma screening and safety planning",
+         country_condition=_has_health_issue("violence_related_trauma")),
+    Rule("safety_needs", "country_specific_risks", "Elevated suicide risk awareness and prevention",
+         country_condition=_has_health_issue("suicide_risk")),
+    Rule("safety_needs", "cultural_safety_considerations",
+         "Consider indigenous cultural safety and traditional healing",
+         country_condition=_has_cultural_factor("indigenous_health_needs")),
+    Rule("safety_needs", "cultural_safety_considerations",
+         "Address socioeconomic safety concerns and resource access",
+         country_condition=_has_cultural_factor("socioeconomic_disparities"))
+]
+
+EVIDENCE_RULES = [
+    _age_treatment_rules,
+    _financial_access_rules,
+    Rule("evidence", "Healthcare System Navigation",
+         "Utilize publicly funded mental health services with no direct cost",
+         country_condition=_healthcare_system_is("universal_healthcare")),
+    Rule("evidence", "Healthcare System Navigation",
+         "Verify insurance coverage and seek in-network providers",
+         country_condition=_healthcare_system_is("private_insurance")),
+    Rule("evidence", "Healthcare System Navigation",
+         "Access NHS mental health services through GP referral or self-referral",
+         country_condition=_healthcare_system_is("nhs")),
+    Rule("evidence", "Cultural Treatment Adaptations",
+         "Consider integration of traditional healing practices with modern treatment",
+         country_condition=_has_cultural_factor("traditional_medicine")),
+    Rule("evidence", "Cultural Treatment Adaptations",
+         "Adapt treatment to include family involvement and collective decision-making",
+         country_condition=_has_cultural_factor("family_centered_care"))
+]
+
+_SEDENTARY = _values("Sedentary")
+
+GENERAL_RULES = [
+    # Physical health recommendations with country context
+    Rule("general", "Physical Health",
+         "Address obesity prevention - priority health issue in {country_name}",
+         exercise_levels=_SEDENTARY, country_condition=_has_health_issue("obesity")),
+    Rule("general", "Physical Health", "Sun-safe exercise options due to high skin cancer rates",
+         exercise_levels=_SEDENTARY, countries=_values("australia"),
+         country_condition=_has_health_issue("skin_cancer")),
+    Rule("general", "Physical Health", "Indoor exercise options for seasonal depression prevention",
+         exercise_levels=_SEDENTARY, countries=_values("sweden")),
+    Rule("general", "Physical Health", "Free community walking groups",
+         exercise_levels=_SEDENTARY, financial_statuses=_values("low_income")),
+    Rule("general", "Physical Health", "Public park exercise facilities",
+         exercise_levels=_SEDENTARY, financial_statuses=_values("low_income")),
+    Rule("general", "Physical Health", "Community center programs",
+         exercise_levels=_SEDENTARY, financial_statuses=_values("low_income")),
+    Rule("general", "Physical Health", "Start with 10-15 minutes of daily walking",
+         exercise_levels=_SEDENTARY, financial_statuses=AnyExcept("low_income")),
+    Rule("general", "Physical Health", "Consider local fitness facilities",
+         exercise_levels=_SEDENTARY, financial_statuses=AnyExcept("low_income")),
+
+    # Mental health with country-specific considerations
+    Rule("general", "Crisis Support", "Contact crisis services: {crisis_resources}",
+         mental_states=SEVERE_MENTAL_STATES, country_condition=_has_crisis_resources),
+    Rule("general", "Crisis Support", "Immediate safety planning with local cultural considerations",
+         mental_states=SEVERE_MENTAL_STATES, country_condition=_has_crisis_resources),
+    Rule("general", "Mental Health", "Consider culturally-sensitive mental health services that address stigma",
+         mental_states=SEVERE_MENTAL_STATES, countries=_values("japan"),
+         country_condition=_has_cultural_factor("mental_health_stigma")),
+    Rule("general", "Mental Health", "Family therapy integration with cultural values",
+         mental_states=SEVERE_MENTAL_STATES, countries=_values("india"),
+         country_condition=_has_cultural_factor("family_centered_care")),
+    Rule("general", "Mental Health", "Community-based healing approaches aligned with Ubuntu philosophy",
+         mental_states=SEVERE_MENTAL_STATES, countries=_values("south_africa"),
+         country_condition=_has_cultural_factor("ubuntu_philosophy")),
+
+    # Employment and social recommendations by country
+    Rule("general", "Social/Professional", "Access Federal Employment Agency (Bundesagentur für Arbeit) services",
+         countries=_values("germany"), employment_keyword="unemployed"),
+    Rule("general", "Social/Professional", "Utilize Employment Insurance and job training programs",
+         countries=_values("canada"), employment_keyword="unemployed"),
+    Rule("general", "Social/Professional", "Access Jobcentre Plus and Universal Credit support",
+         countries=_values("united_kingdom"), employment_keyword="unemployed"),
+    Rule("general", "Social/Professional", "Contact Centrelink for employment services and support",
+         countries=_values("australia"), employment_keyword="unemployed"),
+    Rule("general", "Social/Professional", "Register with Arbetsförmedlingen (Swedish Public Employment Service)",
+         countries=_values("sweden"), employment_keyword="unemployed"),
+
+    # Country-specific daily structure recommendations
+    Rule("general", "Daily Structure", "Light therapy routine during dark winter months",
+         countries=_values("sweden"), age_categories=_values("adult", "middle_aged")),
+    Rule("general", "Daily Structure", "Work-life balance practices to prevent karoshi (overwork)",
+         countries=_values("japan"), employment_keyword="employed"),
+    Rule("general", "Daily Structure", "Include family meal times and community connections",
+         countries=_values("brazil"), country_condition=_has_cultural_factor("family_support"))
+]
+
+RULE_TABLES = {
+    "health_needs": HEALTH_NEEDS_RULES,
+    "safety_needs": SAFETY_NEEDS_RULES,
+    "evidence": EVIDENCE_RULES,
+    "general": GENERAL_RULES
+}
+
+RuleTableEntry = Union[Rule, Callable[[str, Dict[str, Any], Any], Iterable[Rule]]]
+IndexKey = Tuple[str, str, str, str, str]
+SectionRules = Dict[str, Tuple[Rule, ...]]
+
+
+class RecommendationRuleEngine:
+    """
+    Compiles the rule tables against a GlobalHealthDatabase.
+    Each country's table is expanded into concrete rules with rendered messages the
+    first time the country is assessed, then bucketed by every (age_category,
+    mental_state, financial_status, exercise_level) combination. Profiles outside the
+    known value domains fall back to a linear match. Profiles carrying a profile_code
+    (see compact_profile.CompactProfile) are looked up by position instead of by key.
+    """
+
+    def __init__(self, health_db, rule_tables: Optional[Dict[str, List[RuleTableEntry]]] = None):
+        self.health_db = health_db
+        self.rule_tables = rule_tables or RULE_TABLES
+        self.rules: List[Rule] = []
+        self._country_rules: Dict[str, SectionRules] = {}
+        self._index: Dict[IndexKey, SectionRules] = {}
+        self._coded_index: Dict[str, List[SectionRules]] = {}
+        self._compile_lock = threading.Lock()
+
+    def compile_country(self, country: str) -> SectionRules:
+        """Expand and index one known country's rules, once"""
+        with self._compile_lock:
+            country_rules = self._country_rules.get(country)
+            if country_rules is None:
+                country_data = self.health_db.country_health_data[country]
+                country_rules = self._expand_country(country, country_data, register=True)
+                self._country_rules[country] = country_rules
+                self._index_country(country)
+        return country_rules
+
+    def coded_buckets(self, country: str) -> List[SectionRules]:
+        """
+        A known country's rule buckets as a list ordered like itertools.product(AGE_CATEGORIES,
+        MENTAL_STATES, FINANCIAL_STATUSES, EXERCISE_LEVELS), for lookups by position
+        """
+        self.compile_country(country)
+        return self._coded_index[country]
+
+    def compile_all(self):
+        """Compile every country up front, e.g. before forking workers"""
+        for country in self.health_db.country_health_data:
+            self.compile_country(country)
+
+    def _expand_country(self, country: str, country_data: Dict[str, Any], register: bool = False) -> SectionRules:
+        """Resolve country conditions and render messages for one country's rules"""
+        context = {
+            "country_name": country.replace('_', ' ').title(),
+            "mental_health_prevalence": country_data.get("mental_health_prevalence", 0.20) * 100,
+            "crisis_resources": ', '.join(country_data.get("crisis_resources", []))
+        }
+
+        expanded = {}
+        for section, table in self.rule_tables.items():
+            section_rules = []
+            for entry in table:
+                if isinstance(entry, Rule):
+                    if entry.countries is not None and country not in entry.countries:
+                        continue
+                    if entry.country_condition is not None and not entry.country_condition(country_data):
+                        continue
+                    candidates = [replace(entry, message=entry.message.format(**context))]
+                else:
+                    candidates = entry(country, country_data, self.health_db)
+
+                for rule in candidates:
+                    if register:
+                        rule = replace(rule, rule_id=len(self.rules))
+                        self.rules.append(rule)
+                    section_rules.append(rule)
+
+            expanded[section] = tuple(section_rules)
+
+        return expanded
+
+    def _index_country(self, country: str):
+        """Bucket a country's expanded rules under every indexed profile combination"""
+        country_rules = self._country_rules[country]
+        coded = []
+        for key in itertools.product(AGE_CATEGORIES, MENTAL_STATES, FINANCIAL_STATUSES, EXERCISE_LEVELS):
+            rules = {
+                section: tuple(rule for rule in rules if rule.matches_profile(*key))
+                for section, rules in country_rules.items()
+            }
+            self._index[(country,) + key] = rules
+            coded.append(rules)
+        self._coded_index[country] = coded
+
+    def _match(self, country: str, age_category: str, mental_state: str, financial_status: str,
+               exercise_level: str) -> SectionRules:
+        """Linear fallback for profiles outside the compiled index"""
+        country_rules = self._country_rules.get(country)
+        if country_rules is None:
+            country_rules = self._expand_country(country, {})
+
+        return {
+            section: tuple(rule for rule in rules
+                           if rule.matches_profile(age_category, mental_state, financial_status, exercise_level))
+            for section, rules in country_rules.items()
+        }
+
+    def matching_rules(self, patient, age_category: str) -> SectionRules:
+        """Return the rules that can fire for this profile, grouped by section"""
+        profile_code = getattr(patient, 'profile_code', None)
+        if profile_code is not None:
+            coded = self._coded_index.get(patient.country)
+            age_code = _AGE_CODES.get(age_category)
+            if coded is not None and age_code is not None:
+                return coded[age_code * _PROFILE_COMBINATIONS + profile_code]
+
+        key = (patient.country, age_category, patient.mental_state, patient.financial_status,
+               patient.exercise_level)
+        rules = self._index.get(key)
+        if rules is None:
+            if patient.country not in self._country_rules and patient.country in self.health_db.country_health_data:
+                self.compile_country(patient.country)
+                rules = self._index.get(key)
+            if rules is None:
+                rules = self._match(*key)
+        return rules
+
+    def evaluate(self, section: str, patient, age_category: str) -> Dict[str, List[str]]:
+        """Run one assessment pass for a patient"""
+        results = {category: [] for category in SECTION_CATEGORIES[section]}
+        employment = patient.employment_status.lower()
+
+        for rule in self.matching_rules(patient, age_category)[section]:
+            if rule.employment_keyword is None or rule.employment_keyword in employment:
+                results[rule.category].append(rule.message)
+
+        return results
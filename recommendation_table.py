@@ -0,0 +1,267 @@
+"""
+Precomputed recommendation lookup table for the Global Social Worker Chatbot
+Evaluates every combination of the categorical profile inputs through the live
+GlobalSocialWorkerChatbot passes and writes a compact, memory-mappable artifact
+
+File layout (all integers little-endian):
+    magic b'SWRT' | format version (u16) | header length (u32) | header JSON
+    index:   one u32 result id per combination, row-major over the header dimensions
+    offsets: result_count + 1 u64 offsets into the blob section
+    blobs:   the distinct results, each a compact UTF-8 JSON object
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import recommendation_rules
+from recommendation_rules import (AGE_CATEGORIES, EMPLOYMENT_STATUSES, EXERCISE_LEVELS, FINANCIAL_STATUSES,
+                                  MENTAL_STATES)
+from city_index import MAJOR_CITIES_BY_COUNTRY
+from socialworkcountry import GlobalSocialWorkerChatbot, PatientProfile
+
+MAGIC = b'SWRT'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<4sHI')
+
+CITY_CATEGORIES = ("major_city", "suburban", "rural")
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recommendation_table.bin')
+
+# Representative ages and towns used to evaluate each category
+REPRESENTATIVE_AGES = {"young_adult": 21, "adult": 35, "middle_aged": 55, "senior": 70}
+REPRESENTATIVE_TOWNS = {"suburban": "Springfield", "rural": "Riverside Township"}
+
+
+def data_version(chatbot: GlobalSocialWorkerChatbot) -> str:
+    """Fingerprint of the health data and rule definitions a table was built from"""
+    digest = hashlib.sha256()
+    digest.update(chatbot.health_db.data_version.encode('utf-8'))
+    with open(recommendation_rules.__file__, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def table_dimensions(chatbot: GlobalSocialWorkerChatbot) -> List[Tuple[str, Tuple[str, ...]]]:
+    """The indexed profile fields and their value domains, in index order"""
+    return [
+        ("country", tuple(chatbot.health_db.country_health_data)),
+        ("age_category", AGE_CATEGORIES),
+        ("mental_state", MENTAL_STATES),
+        ("financial_status", FINANCIAL_STATUSES),
+        ("exercise_level", EXERCISE_LEVELS),
+        ("employment_status", EMPLOYMENT_STATUSES),
+        ("city_category", CITY_CATEGORIES)
+    ]
+
+
+def _representative_profile(chatbot: GlobalSocialWorkerChatbot, country: str, age_category: str,
+                            mental_state: str, financial_status: str, exercise_level: str,
+                            employment_status: str, city_category: str) -> PatientProfile:
+    """Build a profile that falls into exactly the given combination"""
+    if city_category == "major_city":
+        city = MAJOR_CITIES_BY_COUNTRY[country][0]
+    else:
+        city = REPRESENTATIVE_TOWNS[city_category]
+
+    return PatientProfile(
+        name="", age=REPRESENTATIVE_AGES[age_category], country=country, city=city, gender="",
+        employment_status=employment_status, exercise_level=exercise_level,
+        mental_state=mental_state, financial_status=financial_status
+    )
+
+
+def evaluate_live(chatbot: GlobalSocialWorkerChatbot, patient: PatientProfile) -> Dict[str, Dict[str, List[str]]]:
+    """Run the four assessment passes, keyed like the web assessment response"""
+    return {
+        'country_health_needs': chatbot.assess_country_specific_health_needs(patient),
+        'country_safety_needs': chatbot.assess_country_specific_safety_needs(patient),
+        'country_evidence_recommendations': chatbot.generate_country_evidence_recommendations(patient),
+        'general_recommendations': chatbot.generate_comprehensive_recommendations(patient)
+    }
+
+
+def _iter_combinations(chatbot: GlobalSocialWorkerChatbot):
+    """Yield (combination, representative profile) in index order"""
+    domains = [values for _, values in table_dimensions(chatbot)]
+    for combination in itertools.product(*domains):
+        patient = _representative_profile(chatbot, *combination)
+        if chatbot.determine_city_category(patient.city, patient.country) != combination[-1]:
+            raise ValueError(f"Representative city {patient.city!r} is not a {combination[-1]} in {combination[0]}")
+        yield combination, patient
+
+
+def build_table(path: str, chatbot: Optional[GlobalSocialWorkerChatbot] = None) -> Dict[str, Any]:
+    """Evaluate every combination and write the table artifact to path"""
+    chatbot = chatbot or GlobalSocialWorkerChatbot()
+    dimensions = table_dimensions(chatbot)
+
+    blob_ids: Dict[bytes, int] = {}
+    blobs: List[bytes] = []
+    index: List[int] = []
+
+    for _, patient in _iter_combinations(chatbot):
+        blob = json.dumps(evaluate_live(chatbot, patient), ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+        result_id = blob_ids.get(blob)
+        if result_id is None:
+            result_id = blob_ids[blob] = len(blobs)
+            blobs.append(blob)
+        index.append(result_id)
+
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    header = json.dumps({
+        'data_version': data_version(chatbot),
+        'dimensions': [[name, list(values)] for name, values in dimensions],
+        'combinations': len(index),
+        'result_count': len(blobs)
+    }, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(struct.pack(f'<{len(index)}I', *index))
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+    return {'path': path, 'combinations': len(index), 'distinct_results': len(blobs),
+            'bytes': os.path.getsize(path)}
+
+
+class RecommendationTable:
+    """
+    Read-only view of a table artifact. The file is memory-mapped; a lookup computes
+    the flat combination index, reads one u32 result id and decodes that result once.
+    Returned results are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} recommendation table")
+
+        header_start = PREAMBLE.size
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+
+        self.data_version = header['data_version']
+        self.dimensions = [(name, tuple(values)) for name, values in header['dimensions']]
+        self.result_count = header['result_count']
+
+        # Row-major strides and value positions for direct indexing
+        self._positions = [{value: i for i, value in enumerate(values)} for _, values in self.dimensions]
+        self._strides = []
+        stride = 1
+        for _, values in reversed(self.dimensions):
+            self._strides.insert(0, stride)
+            stride *= len(values)
+
+        self._index_offset = header_start + header_length
+        self._offsets_offset = self._index_offset + 4 * header['combinations']
+        self._blobs_offset = self._offsets_offset + 8 * (self.result_count + 1)
+
+        self._decoded: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def combination_index(self, values: Tuple[str, ...]) -> Optional[int]:
+        """Flat index of a combination, or None if any value is outside the table"""
+        flat = 0
+        for value, positions, stride in zip(values, self._positions, self._strides):
+            position = positions.get(value)
+            if position is None:
+                return None
+            flat += position * stride
+        return flat
+
+    def result(self, result_id: int) -> Dict[str, Any]:
+        """Decode (once) and return a stored result"""
+        result = self._decoded.get(result_id)
+        if result is None:
+            start, end = struct.unpack_from('<QQ', self._mmap, self._offsets_offset + 8 * result_id)
+            result = json.loads(self._mmap[self._blobs_offset + start:self._blobs_offset + end].decode('utf-8'))
+            with self._lock:
+                self._decoded.setdefault(result_id, result)
+        return result
+
+    def lookup(self, country: str, age_category: str, mental_state: str, financial_status: str,
+               exercise_level: str, employment_status: str, city_category: str) -> Optional[Dict[str, Any]]:
+        """Return the four assessment passes for a combination, or None if it is not in the table"""
+        flat = self.combination_index((country, age_category, mental_state, financial_status,
+                                       exercise_level, employment_status, city_category))
+        if flat is None:
+            return None
+        result_id, = struct.unpack_from('<I', self._mmap, self._index_offset + 4 * flat)
+        return self.result(result_id)
+
+    def close(self):
+        self._mmap.close()
+
+
+def load_table(path: str, chatbot: GlobalSocialWorkerChatbot) -> Optional[RecommendationTable]:
+    """Open the table at path if it exists and was built from the chatbot's current data"""
+    if not os.path.exists(path):
+        return None
+
+    table = RecommendationTable(path)
+    if table.data_version != data_version(chatbot):
+        table.close()
+        raise ValueError(f"{path} was built from different health data or rules; rebuild it")
+    return table
+
+
+def verify_table(path: str, chatbot: Optional[GlobalSocialWorkerChatbot] = None, max_reported: int = 10) -> int:
+    """Diff every table entry against live evaluation, print mismatches and return their count"""
+    chatbot = chatbot or GlobalSocialWorkerChatbot()
+    table = RecommendationTable(path)
+    mismatches = 0
+
+    try:
+        if table.data_version != data_version(chatbot):
+            print(f"Data version differs: table {table.data_version}, live {data_version(chatbot)}")
+
+        for combination, patient in _iter_combinations(chatbot):
+            if table.lookup(*combination) != evaluate_live(chatbot, patient):
+                mismatches += 1
+                if mismatches <= max_reported:
+                    print(f"Mismatch for {combination}")
+    finally:
+        table.close()
+
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or verify the precomputed recommendation table")
+    parser.add_argument('command', choices=['build', 'verify'])
+    parser.add_argument('--path', default=DEFAULT_TABLE_PATH, help="Table artifact location")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        summary = build_table(args.path)
+        print(f"Wrote {summary['combinations']} combinations ({summary['distinct_results']} distinct results, "
+              f"{summary['bytes']} bytes) to {summary['path']}")
+        return 0
+
+    mismatches = verify_table(args.path)
+    print("Table matches live evaluation" if not mismatches else f"{mismatches} combinations differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Write-behind persistence for saved assessments
+Requests hand assessments to a bounded in-memory queue and get their id back at
+once; a background thread group-commits them to the AssessmentStore in batches.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from assessment_store import AssessmentStore
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue is at capacity and the save was dropped"""
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue in front of an AssessmentStore. The writer thread takes the first
+    waiting record, collects more for up to flush_interval seconds (or batch_size
+    records) and writes them with one save_many call, i.e. one transaction.
+    The thread starts on first use in each process, so a queue created before a
+    fork is safe to use in the workers. on_flush, if given, is called on the writer
+    thread with the ids of every batch that was written.
+    """
+
+    def __init__(self, store: AssessmentStore, max_size: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.05, on_flush: Optional[Callable[[List[str]], None]] = None):
+        self.store = store
+        self.on_flush = on_flush
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._flush_seconds_total = 0.0
+        self._flush_seconds_last = 0.0
+        self._flush_seconds_max = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked child: records queued in the parent belong to the parent
+                self._queue = queue.Queue(maxsize=self.max_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='assessment-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, assessment: Dict[str, Any]) -> str:
+        """Queue an assessment for saving and return its id; raises QueueFullError when full"""
+        self._ensure_started()
+        assessment_id = self.store.new_id()
+        try:
+            self._queue.put_nowait((assessment_id, assessment))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            raise QueueFullError(f"Save queue is full ({self.max_size} pending)")
+
+        with self._stats_lock:
+            self.enqueued += 1
+        return assessment_id
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        try:
+            self.store.save_many([assessment for _, assessment in batch],
+                                 [assessment_id for assessment_id, _ in batch])
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} queued assessments: {str(e)}")
+            with self._stats_lock:
+                self.failed += len(batch)
+            return
+
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.written += len(batch)
+            self.batches += 1
+            self._flush_seconds_total += elapsed
+            self._flush_seconds_last = elapsed
+            self._flush_seconds_max = max(self._flush_seconds_max, elapsed)
+
+        if self.on_flush is not None:
+            try:
+                self.on_flush([assessment_id for assessment_id, _ in batch])
+            except Exception as e:
+                logger.error(f"Save queue flush callback failed: {str(e)}")
+
+    def close(self, timeout: float = 30.0):
+        """Write every pending record and stop the writer thread"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Save queue did not drain within {timeout}s; {self._queue.qsize()} records pending")
+        else:
+            logger.info(f"Save queue drained ({self.written} written, {self.failed} failed)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput, flush latency and drop counters"""
+        with self._stats_lock:
+            return {
+                'depth': self._queue.qsize(),
+                'max_size': self.max_size,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'avg_batch_size': round(self.written / self.batches, 2) if self.batches else 0.0,
+                'flush_ms_last': round(self._flush_seconds_last * 1000, 3),
+                'flush_ms_avg': round(self._flush_seconds_total / self.batches * 1000, 3) if self.batches else 0.0,
+                'flush_ms_max': round(self._flush_seconds_max * 1000, 3)
+            }
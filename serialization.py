@@ -0,0 +1,146 @@
+"""
+JSON serialization for the Global Social Worker web backend
+Uses orjson when it is installed and the standard library otherwise; both produce
+compact, key-sorted UTF-8 JSON. A Fragment is a dict that carries its own encoded
+form: static parts of a response (country context, cached recommendations) are
+encoded once when they are built and spliced into every response containing them.
+orjson 3.9.15+ splices natively; otherwise fragments go out as placeholder strings
+that are replaced in one pass over the encoded bytes.
+"""
+
+import json
+import re
+import secrets
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fragments are first encoded as a placeholder string and then replaced by their bytes;
+# the per-process token keeps client-supplied strings from ever matching a placeholder
+_TOKEN = secrets.token_hex(8)
+_PLACEHOLDER = re.compile(rb'"\\u0000' + _TOKEN.encode('ascii') + rb':(\d+)\\u0000"')
+
+# The standard library cannot hook dict subclasses, so fragments are swapped for their
+# placeholders in a walk of the payload. Responses hold them at most three containers
+# deep ({"results": [{"country_context": ...}]}); deeper ones are encoded in place.
+_STDLIB_FRAGMENT_DEPTH = 3
+
+
+class Fragment(dict):
+    """A dict encoded once at construction; like other shared results it must not be modified"""
+
+    __slots__ = ('json',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.json: bytes = encode_json(dict(self))
+
+    def __reduce__(self):
+        return Fragment, (dict(self),)
+
+
+def _placeholder(fragments: List[bytes], fragment: Fragment) -> str:
+    fragments.append(fragment.json)
+    return f"\x00{_TOKEN}:{len(fragments) - 1}\x00"
+
+
+def _splice(encoded: bytes, fragments: List[bytes]) -> bytes:
+    if not fragments:
+        return encoded
+    # split() leaves the captured fragment numbers at the odd positions
+    parts = _PLACEHOLDER.split(encoded)
+    parts[1::2] = [fragments[int(number)] for number in parts[1::2]]
+    return b''.join(parts)
+
+
+_NATIVE_FRAGMENTS = orjson is not None and hasattr(orjson, 'Fragment')
+
+
+def _encode_orjson(value: Any, indent: bool = False) -> bytes:
+    fragments: List[bytes] = []
+
+    def default(obj):
+        if isinstance(obj, Fragment):
+            if _NATIVE_FRAGMENTS and not indent:
+                return orjson.Fragment(obj.json)
+            return _placeholder(fragments, obj)
+        # Subclasses are passed through so that fragments reach this hook; the rest
+        # encode as their base type, as they do with the standard library
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        if isinstance(obj, str):
+            return str(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+        if isinstance(obj, list):
+            return list(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return _splice(orjson.dumps(value, default=default, option=option), fragments)
+
+
+def _swap_fragments(value: Any, fragments: List[bytes], depth: int = _STDLIB_FRAGMENT_DEPTH) -> Any:
+    """Copy of a container with fragments replaced by placeholders; returned as it is if it holds none"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple)):
+        items = enumerate(value)
+    else:
+        return value
+
+    swapped = None
+    for key, item in items:
+        if isinstance(item, Fragment):
+            new = _placeholder(fragments, item)
+        elif depth > 1 and isinstance(item, (dict, list, tuple)):
+            new = _swap_fragments(item, fragments, depth - 1)
+        else:
+            continue
+        if new is not item:
+            if swapped is None:
+                swapped = dict(value) if isinstance(value, dict) else list(value)
+            swapped[key] = new
+    return value if swapped is None else swapped
+
+
+def _encode_stdlib(value: Any, indent: bool = False) -> bytes:
+    fragments: List[bytes] = []
+    value = _placeholder(fragments, value) if isinstance(value, Fragment) else _swap_fragments(value, fragments)
+
+    def default(obj):
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    encoded = json.dumps(value, default=default, sort_keys=True, ensure_ascii=False,
+                         indent=2 if indent else None, separators=None if indent else (',', ':'))
+    return _splice(encoded.encode('utf-8'), fragments)
+
+
+# Backend name -> encoder; benchmarks compare them directly
+ENCODERS: Dict[str, Callable[..., bytes]] = {'json': _encode_stdlib}
+if orjson is not None:
+    ENCODERS['orjson'] = _encode_orjson
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def encode_json(value: Any, indent: bool = False) -> bytes:
+    """Encode value as compact (or indented), key-sorted UTF-8 JSON, splicing in any fragments"""
+    return ENCODERS[BACKEND](value, indent)
+
+
+def decode_json(data: Any) -> Any:
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -4,25 +4,63 @@ FIXED VERSION - Properly changes port and keeps all functionality working
 INCLUDES: Solution 1 (absolute path) + Solution 2 (debugging)
 """
 
-from flask import Flask, request, jsonify, render_template_string, send_from_directory
+from flask import Flask, Response, request, jsonify, make_response, render_template_string, send_from_directory, \
+    stream_with_context, abort
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.wsgi import get_input_stream
 import json
 import datetime
 import os
 import logging
 import webbrowser
 import threading
+import atexit
+import hmac
+from functools import wraps
 from dataclasses import asdict
 
 # Import your existing chatbot classes
 try:
     from socialworkcountry import GlobalSocialWorkerChatbot, PatientProfile
     from input_validation import ValidatedInputCollector, GlobalInputValidator
+    from http_cache import IndexPageRenderer, ReferencePayloadCache
+    from bulk_assessment import BatchPayloadError, BatchTooLargeError, iter_ndjson_records, parse_batch_payload, \
+        read_bounded_lines
+    from assessment_cache import AssessmentCache
+    from recommendation_rules import MENTAL_STATES
+    from recommendation_table import DEFAULT_TABLE_PATH, load_table
+    from assessment_store import DEFAULT_DB_PATH, FILTER_COLUMNS, country_code, encode_cursor, normalize_label, \
+        open_assessment_store
+    from save_queue import QueueFullError, WriteBehindQueue
+    from assessment_log import AssessmentLog
+    from crisis_detection import CRISIS_DETECTOR
+    from serialization import BACKEND as JSON_BACKEND, Fragment, decode_json, encode_json
+    from compression import COMPRESSIBLE_MIMETYPES, ENCODINGS as COMPRESSION_CODINGS, ResponseCompressor
 except ImportError as e:
     print(f"Import Error: {e}")
     print("Make sure socialworkcountry.py and input_validation.py are in the same directory")
 
+# NumPy is only needed for the /api/analytics endpoints
+try:
+    from analytics import FIELDS as ANALYTICS_FIELDS, CaseloadAnalytics
+except ImportError:
+    ANALYTICS_FIELDS, CaseloadAnalytics = (), None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify and request.get_json through serialization.py (orjson when installed)"""
+
+    def loads(self, s, **kwargs):
+        return decode_json(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(encode_json(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for cross-origin requests
 
 # Configure logging
@@ -34,6 +72,57 @@ CUSTOM_PORT = 5000
 CUSTOM_TITLE = "Professional Social Worker Assessment"
 CUSTOM_BRAND = "SocialWorker Pro"
 
+# Maximum number of patient records accepted by /api/assess/batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 500))
+
+# Largest body in bytes of the routes that read it whole; bigger ones get 413 before they are parsed
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+
+# /api/assess/stream takes caseloads of any size but reads them one line at a time;
+# a longer line is reported as an error for that record
+MAX_STREAM_LINE_LENGTH = int(os.environ.get('MAX_STREAM_LINE_LENGTH', 64 * 1024))
+
+# Memoized assessment results, keyed by the non-identifying profile signature
+ASSESSMENT_CACHE_SIZE = int(os.environ.get('ASSESSMENT_CACHE_SIZE', 4096))
+ASSESSMENT_CACHE_TTL = float(os.environ.get('ASSESSMENT_CACHE_TTL', 3600))
+
+# Precomputed recommendation table built by `python recommendation_table.py build`
+RECOMMENDATION_TABLE_PATH = os.environ.get('RECOMMENDATION_TABLE_PATH', DEFAULT_TABLE_PATH)
+
+# Saved assessments: "sqlite" (ASSESSMENT_STORE_PATH is the database file) or "json" (a directory)
+ASSESSMENT_STORE = os.environ.get('ASSESSMENT_STORE', 'sqlite')
+ASSESSMENT_STORE_PATH = os.environ.get('ASSESSMENT_STORE_PATH', DEFAULT_DB_PATH if ASSESSMENT_STORE == 'sqlite' else '.')
+ASSESSMENT_FSYNC = os.environ.get('ASSESSMENT_FSYNC', 'normal')
+
+# Write-behind save queue: capacity, records per group commit and how long a batch may wait
+SAVE_QUEUE_SIZE = int(os.environ.get('SAVE_QUEUE_SIZE', 10000))
+SAVE_BATCH_SIZE = int(os.environ.get('SAVE_BATCH_SIZE', 256))
+SAVE_FLUSH_INTERVAL = float(os.environ.get('SAVE_FLUSH_INTERVAL', 0.05))
+
+# Seconds clients may reuse reference responses (countries, emergency resources, bootstrap)
+# before revalidating them with If-None-Match
+REFERENCE_CACHE_MAX_AGE = int(os.environ.get('REFERENCE_CACHE_MAX_AGE', 300))
+
+# Response compression: codings offered in order of preference ("br" needs the Brotli package;
+# empty disables compression) and the smallest dynamic body worth compressing
+COMPRESSION_ENCODINGS = os.environ.get('COMPRESSION_ENCODINGS', 'br,gzip')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# Page sizes for GET /api/assessments
+ASSESSMENT_PAGE_SIZE = int(os.environ.get('ASSESSMENT_PAGE_SIZE', 50))
+MAX_ASSESSMENT_PAGE_SIZE = int(os.environ.get('MAX_ASSESSMENT_PAGE_SIZE', 500))
+
+# Bearer token required to read saved assessments back (GET /api/assessments*); the routes are
+# disabled while it is unset because the records hold names, mental state and finances
+ASSESSMENTS_API_TOKEN = os.environ.get('ASSESSMENTS_API_TOKEN', '')
+
+# Segmented audit log of every generated assessment; disabled unless a directory is set
+ASSESSMENT_LOG_DIR = os.environ.get('ASSESSMENT_LOG_DIR', '')
+ASSESSMENT_LOG_SEGMENT_MB = int(os.environ.get('ASSESSMENT_LOG_SEGMENT_MB', 64))
+ASSESSMENT_LOG_SEGMENT_SECONDS = float(os.environ.get('ASSESSMENT_LOG_SEGMENT_SECONDS', 3600))
+# Retention and compaction run outside the server: python assessment_log.py <dir> retention --days N
+
 
 class WebSocialWorkerChatbot:
     """
@@ -45,6 +134,47 @@ class WebSocialWorkerChatbot:
         self.chatbot = GlobalSocialWorkerChatbot()
         self.validator = GlobalInputValidator()
         self.session_data = {}
+        self.assessment_cache = AssessmentCache(ASSESSMENT_CACHE_SIZE, ASSESSMENT_CACHE_TTL)
+        self.recommendation_table = self._load_recommendation_table()
+        self.assessment_store = open_assessment_store(ASSESSMENT_STORE, ASSESSMENT_STORE_PATH, ASSESSMENT_FSYNC)
+        self.analytics = CaseloadAnalytics() if CaseloadAnalytics is not None else None
+        self.save_queue = WriteBehindQueue(self.assessment_store, SAVE_QUEUE_SIZE, SAVE_BATCH_SIZE,
+                                           SAVE_FLUSH_INTERVAL, on_flush=self._on_saved)
+        self.assessment_log = AssessmentLog(
+            ASSESSMENT_LOG_DIR, max_segment_bytes=ASSESSMENT_LOG_SEGMENT_MB * 1024 * 1024,
+            max_segment_age=ASSESSMENT_LOG_SEGMENT_SECONDS
+        ) if ASSESSMENT_LOG_DIR else None
+
+    def _on_saved(self, assessment_ids):
+        """Fold newly written assessments into the analytics arrays"""
+        if self.analytics is not None:
+            self.sync_analytics()
+
+    def sync_analytics(self):
+        """
+        Append store rows the analytics arrays have not seen yet. Rows are read by
+        seq, so saves made by other worker processes are picked up as well; the
+        first call loads the whole store.
+        """
+        try:
+            added = self.analytics.sync(self.assessment_store)
+        except NotImplementedError:
+            return False
+        if added > 100:
+            logger.info(f"Loaded {added} saved assessments into caseload analytics")
+        return True
+
+    def _load_recommendation_table(self):
+        """Open the precomputed recommendation table, falling back to live evaluation without it"""
+        try:
+            table = load_table(RECOMMENDATION_TABLE_PATH, self.chatbot)
+        except ValueError as e:
+            logger.warning(f"Ignoring recommendation table: {str(e)}")
+            return None
+
+        if table is not None:
+            logger.info(f"Loaded recommendation table {table.path} ({table.result_count} distinct results)")
+        return table
 
     def validate_and_convert_patient_data(self, web_data):
         """Convert web form data to PatientProfile format with validation"""
@@ -85,6 +215,9 @@ class WebSocialWorkerChatbot:
             elif web_field == 'mental':
                 value = self._convert_web_value_to_display(web_field, value)
                 result = self.validator.validate_mental_state(value)
+                if result.is_valid:
+                    # The validator answers with the menu number; the chatbot works with the display value
+                    result.value = MENTAL_STATES[int(result.value) - 1]
             elif web_field == 'notes':
                 result = self.validator.validate_additional_notes(value)
             else:
@@ -153,6 +286,31 @@ class WebSocialWorkerChatbot:
 
         return conversions.get(field, {}).get(value, value)
 
+    def validate_fields(self, fields, context=None):
+        """Validate any subset of the form in one call, returning a result per field"""
+        context = context or {}
+        country = context.get('country') or fields.get('country') or None
+        results = {}
+
+        for field_name, value in fields.items():
+            validate = VALIDATION_DISPATCH.get(field_name)
+            if validate is None:
+                results[field_name] = {
+                    'is_valid': False,
+                    'message': f'Validation not implemented for field: {field_name}',
+                    'suggestions': sorted(VALIDATION_DISPATCH)
+                }
+                continue
+
+            result = validate(self, value, country)
+            results[field_name] = {
+                'is_valid': result.is_valid,
+                'message': result.error_message if not result.is_valid else 'Valid',
+                'suggestions': result.suggestions
+            }
+
+        return results
+
     def generate_assessment(self, patient_data):
         """Generate complete assessment using your existing chatbot logic"""
         try:
@@ -164,12 +322,16 @@ class WebSocialWorkerChatbot:
                     'errors': validation_errors
                 }
 
-            country_health_needs = self.chatbot.assess_country_specific_health_needs(patient)
-            country_safety_needs = self.chatbot.assess_country_specific_safety_needs(patient)
-            country_evidence_recs = self.chatbot.generate_country_evidence_recommendations(patient)
-            general_recommendations = self.chatbot.generate_comprehensive_recommendations(patient)
+            age_category = self.chatbot.determine_age_category(patient.age)
+            city_category = self.chatbot.determine_city_category(patient.city, patient.country)
+            crisis_language = self._detect_crisis_language(patient.additional_notes)
 
-            country_data = self.chatbot.health_db.country_health_data.get(patient.country, {})
+            # Everything except the per-patient fields depends only on the profile signature
+            signature = self._profile_signature(patient, age_category, city_category, crisis_language)
+            shared = self.assessment_cache.get(signature)
+            if shared is None:
+                shared = self._build_shared_assessment(patient, age_category, city_category, crisis_language)
+                self.assessment_cache.put(signature, shared)
 
             assessment_result = {
                 'success': True,
@@ -185,25 +347,21 @@ class WebSocialWorkerChatbot:
                     'mental_state': patient.mental_state,
                     'additional_notes': patient.additional_notes
                 },
-                'country_context': {
-                    'name': patient.country.replace('_', ' ').title(),
-                    'mental_health_prevalence': country_data.get('mental_health_prevalence', 0.20) * 100,
-                    'healthcare_system': country_data.get('healthcare_system', 'Unknown').replace('_', ' ').title(),
-                    'common_health_issues': country_data.get('common_health_issues', [])[:3],
-                    'crisis_resources': country_data.get('crisis_resources', [])
-                },
-                'assessments': {
-                    'country_health_needs': country_health_needs,
-                    'country_safety_needs': country_safety_needs,
-                    'country_evidence_recommendations': country_evidence_recs,
-                    'general_recommendations': general_recommendations
-                },
-                'risk_indicators': self._assess_risk_level(patient),
+                'country_context': shared['country_context'],
+                'assessments': shared['assessments'],
+                'risk_indicators': shared['risk_indicators'],
                 'timestamp': datetime.datetime.now().isoformat(),
-                'age_category': self.chatbot.determine_age_category(patient.age),
-                'city_category': self.chatbot.determine_city_category(patient.city, patient.country)
+                'age_category': age_category,
+                'city_category': city_category
             }
 
+            if self.assessment_log is not None:
+                # The audit log must never turn a valid assessment into a failed one
+                try:
+                    self.assessment_log.append(assessment_result)
+                except Exception as e:
+                    logger.error(f"Assessment log append failed: {str(e)}")
+
             return assessment_result
 
         except Exception as e:
@@ -214,8 +372,94 @@ class WebSocialWorkerChatbot:
                 'message': str(e)
             }
 
-    def _assess_risk_level(self, patient):
+    def _profile_signature(self, patient, age_category, city_category, crisis_language):
+        """Normalized key of every profile field the assessment output depends on"""
+        # Risk factors use finer age thresholds than the age categories
+        if patient.age < 18:
+            age_band = 'minor'
+        elif patient.age > 75:
+            age_band = 'over_75'
+        else:
+            age_band = ''
+
+        return (patient.country, age_category, age_band, city_category, patient.employment_status,
+                patient.exercise_level, patient.mental_state, patient.financial_status, crisis_language)
+
+    def _build_shared_assessment(self, patient, age_category, city_category, crisis_language):
+        """Build the cacheable part of an assessment; the result is shared and must not be mutated"""
+        assessments = None
+        if self.recommendation_table is not None:
+            assessments = self.recommendation_table.lookup(
+                patient.country, age_category, patient.mental_state, patient.financial_status,
+                patient.exercise_level, patient.employment_status, city_category
+            )
+
+        if assessments is None:
+            assessments = {
+                'country_health_needs': self.chatbot.assess_country_specific_health_needs(patient),
+                'country_safety_needs': self.chatbot.assess_country_specific_safety_needs(patient),
+                'country_evidence_recommendations': self.chatbot.generate_country_evidence_recommendations(patient),
+                'general_recommendations': self.chatbot.generate_comprehensive_recommendations(patient)
+            }
+
+        country_data = self.chatbot.health_db.country_health_data.get(patient.country, {})
+
+        # Fragments are encoded here, once per signature, and spliced into every response
+        return {
+            'country_context': Fragment({
+                'name': patient.country.replace('_', ' ').title(),
+                'mental_health_prevalence': country_data.get('mental_health_prevalence', 0.20) * 100,
+                'healthcare_system': country_data.get('healthcare_system', 'Unknown').replace('_', ' ').title(),
+                'common_health_issues': country_data.get('common_health_issues', [])[:3],
+                'crisis_resources': country_data.get('crisis_resources', [])
+            }),
+            'assessments': Fragment(assessments),
+            'risk_indicators': Fragment(self._assess_risk_level(patient, crisis_language))
+        }
+
+    def _assess_record(self, index, patient_data, parse_error=""):
+        """Assess one bulk record, turning parse and shape problems into an error result"""
+        if parse_error:
+            result = {
+                'success': False,
+                'error': 'Invalid record',
+                'message': parse_error
+            }
+        elif not isinstance(patient_data, dict):
+            result = {
+                'success': False,
+                'error': 'Invalid record',
+                'message': 'Each patient record must be a JSON object'
+            }
+        else:
+            result = self.generate_assessment(patient_data)
+
+        result['index'] = index
+        return result
+
+    def stream_assessments(self, records):
+        """Lazily assess an iterable of (record, parse_error) pairs, yielding results in input order"""
+        for index, (patient_data, parse_error) in enumerate(records):
+            yield self._assess_record(index, patient_data, parse_error)
+
+    def stream_assessments_from_file(self, path):
+        """Yield assessment results for an NDJSON caseload file without loading it into memory"""
+        with open(path, 'rb') as f:
+            yield from self.stream_assessments(iter_ndjson_records(f))
+
+    def generate_batch_assessment(self, records):
+        """Assess (record, parse_error) pairs and return per-item results in input order"""
+        return list(self.stream_assessments(records))
+
+    def _detect_crisis_language(self, notes):
+        """Return True when the notes contain self-harm or suicidal-intent language, in any supported language"""
+        return CRISIS_DETECTOR.is_crisis(notes or '')
+
+    def _assess_risk_level(self, patient, crisis_language=None):
         """Assess overall risk level for the patient"""
+        if crisis_language is None:
+            crisis_language = self._detect_crisis_language(patient.additional_notes)
+
         risk_level = 'low'
         risk_factors = []
 
@@ -226,13 +470,9 @@ class WebSocialWorkerChatbot:
             risk_level = 'high' if risk_level != 'critical' else risk_level
             risk_factors.append('Poor mental health state')
 
-        if patient.additional_notes:
-            crisis_keywords = ['suicide', 'kill myself', 'hurt myself', 'end it all', 'want to die']
-            for keyword in crisis_keywords:
-                if keyword in patient.additional_notes.lower():
-                    risk_level = 'critical'
-                    risk_factors.append('Crisis language detected in notes')
-                    break
+        if crisis_language:
+            risk_level = 'critical'
+            risk_factors.append('Crisis language detected in notes')
 
         if patient.age < 18:
             risk_factors.append('Minor patient - requires specialized care')
@@ -249,91 +489,165 @@ class WebSocialWorkerChatbot:
         }
 
 
+# Field name -> validator call. Each entry receives (web chatbot, raw value, country code);
+# coded form values are converted to their display text before validation.
+VALIDATION_DISPATCH = {
+    'name': lambda bot, value, country: bot.validator.validate_name(str(value or '')),
+    'age': lambda bot, value, country: bot.validator.validate_age(str(value if value is not None else '')),
+    'country': lambda bot, value, country: bot.validator.validate_country_selection(str(value or '')),
+    'city': lambda bot, value, country: bot.validator.validate_city(str(value or ''), country),
+    'gender': lambda bot, value, country: bot.validator.validate_gender_selection(
+        bot._convert_web_value_to_display('gender', str(value or ''))),
+    'employment': lambda bot, value, country: bot.validator.validate_employment_status(
+        bot._convert_web_value_to_display('employment', str(value or ''))),
+    'financial': lambda bot, value, country: bot.validator.validate_financial_status(
+        bot._convert_web_value_to_display('financial', str(value or '')), country),
+    'exercise': lambda bot, value, country: bot.validator.validate_exercise_level(
+        bot._convert_web_value_to_display('exercise', str(value or ''))),
+    'mental': lambda bot, value, country: bot.validator.validate_mental_state(
+        bot._convert_web_value_to_display('mental', str(value or ''))),
+    'notes': lambda bot, value, country: bot.validator.validate_additional_notes(str(value or '')),
+    'yes_no': lambda bot, value, country: bot.validator.validate_yes_no_input(str(value or '')),
+    'profile': lambda bot, value, country: bot.validator.validate_complete_profile(
+        value if isinstance(value, dict) else {})
+}
+
 # Initialize the web chatbot
 web_chatbot = WebSocialWorkerChatbot()
 
+# Write out queued saves and the buffered audit log block when the process exits
+atexit.register(web_chatbot.save_queue.close)
+if web_chatbot.assessment_log is not None:
+    atexit.register(web_chatbot.assessment_log.close)
 
-# Main route - Serve the interactive website
-@app.route('/')
-def index():
-    """Serve the main assessment page with proper port configuration and debugging"""
 
-    # SOLUTION 2: Debug information
-    print(f"🔍 DEBUG - Current working directory: {os.getcwd()}")
-    print(f"🔍 DEBUG - Files in current directory: {os.listdir('.')}")
-    print(f"🔍 DEBUG - __file__ location: {os.path.abspath(__file__)}")
+def _template_client_html(html_content, api_base_url):
+    """Apply the custom title, brand and API URL to the raw client.html source"""
+    # Update the title
+    html_content = html_content.replace(
+        '<title>Global Social Worker Assessment - Full Stack</title>',
+        f'<title>{CUSTOM_TITLE}</title>'
+    )
 
-    # SOLUTION 1: Use absolute path to find client.html
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    html_file_path = os.path.join(current_dir, 'client.html')
+    # Update the header
+    html_content = html_content.replace(
+        '<h1>🌍 Global Social Worker Assessment</h1>',
+        f'<h1>🏥 {CUSTOM_BRAND}</h1>'
+    )
 
-    print(f"🔍 DEBUG - Looking for client.html at: {html_file_path}")
-    print(f"🔍 DEBUG - File exists: {os.path.exists(html_file_path)}")
+    # Replace the API URL in the HTML
+    old_api_line = "API_BASE_URL = 'http://localhost:5000/api';"
+    new_api_line = f"API_BASE_URL = '{api_base_url}';"
+    html_content = html_content.replace(old_api_line, new_api_line)
 
-    # Try multiple possible paths
-    possible_paths = [
-        html_file_path,  # Absolute path
-        'client.html',  # Relative path
-        './client.html',  # Current directory
-        os.path.join('.', 'client.html')  # Explicit current directory
-    ]
+    # Also replace any other hardcoded references
+    return html_content.replace('http://localhost:5000/api', api_base_url)
 
-    print(f"🔍 DEBUG - Trying paths: {possible_paths}")
 
-    try:
-        html_content = None
-        found_path = None
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                print(f"✅ Found client.html at: {path}")
-                with open(path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-                found_path = path
-                break
-
-        if html_content is None:
-            raise FileNotFoundError("client.html not found in any expected location")
-
-        # Update the title
-        html_content = html_content.replace(
-            '<title>Global Social Worker Assessment - Full Stack</title>',
-            f'<title>{CUSTOM_TITLE}</title>'
-        )
+# SOLUTION 1: Use absolute path to find client.html, falling back to the working directory
+CLIENT_HTML_PATHS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'client.html'),
+    'client.html'
+]
 
-        # Update the header
-        html_content = html_content.replace(
-            '<h1>🌍 Global Social Worker Assessment</h1>',
-            f'<h1>🏥 {CUSTOM_BRAND}</h1>'
-        )
+compressor = ResponseCompressor(COMPRESSION_MIN_SIZE, [
+    coding.strip() for coding in COMPRESSION_ENCODINGS.split(',') if coding.strip() in COMPRESSION_CODINGS
+])
+
+# The index page and the reference payloads are compressed once, when they are built
+index_renderer = IndexPageRenderer(CLIENT_HTML_PATHS, _template_client_html, precompress=compressor.precompress)
+
+# Reference payloads are serialized once per health database version
+reference_payloads = ReferencePayloadCache(lambda: web_chatbot.chatbot.health_db.data_version,
+                                           precompress=compressor.precompress)
+
+
+def _cached_page_response(page):
+    """Response for a cached page in the best precompressed coding the client accepts"""
+    coding = compressor.negotiate(request.headers.get('Accept-Encoding')) if page.variants else None
+    body = page.variants.get(coding) if coding is not None else None
+
+    response = make_response(page.body if body is None else body)
+    if page.variants:
+        response.vary.add('Accept-Encoding')
+    if body is None:
+        response.set_etag(page.etag)
+    else:
+        # Each coding is a different representation, so it gets its own strong ETag
+        response.content_encoding = coding
+        response.set_etag(f"{page.etag}-{coding}")
+        response.identity_size = len(page.body)
+    return response
+
+
+@app.before_request
+def read_request_body():
+    """
+    Read POST bodies before the route runs, so one over MAX_CONTENT_LENGTH is refused by the
+    413 handler before anything is parsed. The streaming route is bounded per line instead.
+    """
+    if request.method == 'POST' and request.endpoint != 'assess_stream':
+        # A declared Content-Length over the limit raises here; a chunked body is cut off at it
+        body = request.get_data()
+        if request.content_length is None and len(body) >= app.config['MAX_CONTENT_LENGTH']:
+            abort(413)
+
+
+@app.after_request
+def compress_response(response):
+    """Compress dynamic responses the client accepts compressed; count precompressed ones"""
+    identity_size = getattr(response, 'identity_size', None)
+    if identity_size is not None:
+        if response.status_code == 200:
+            compressor.served_precompressed(response.content_encoding, identity_size, response.content_length)
+        return response
+
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or response.is_streamed
+            or response.content_encoding or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    coding = compressor.negotiate(request.headers.get('Accept-Encoding'))
+    if coding is None:
+        return response
+
+    body = compressor.compress(response.get_data(), coding)
+    if body is not None:
+        response.set_data(body)
+        response.content_encoding = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{coding}", weak)
+    return response
+
+
+# Main route - Serve the interactive website
+@app.route('/')
+def index():
+    """Serve the main assessment page from the in-memory page cache"""
+    possible_paths = CLIENT_HTML_PATHS
 
+    try:
         # Determine the correct API URL based on environment
         if os.environ.get('RENDER'):
             # Running on Render
             api_base_url = f"{request.scheme}://{request.host}/api"
-            print(f"🌐 Production mode - API URL: {api_base_url}")
         else:
             # Running locally
             api_base_url = f"http://localhost:{CUSTOM_PORT}/api"
-            print(f"🏠 Development mode - API URL: {api_base_url}")
 
-        # Replace the API URL in the HTML
-        old_api_line = "API_BASE_URL = 'http://localhost:5000/api';"
-        new_api_line = f"API_BASE_URL = '{api_base_url}';"
-        html_content = html_content.replace(old_api_line, new_api_line)
-
-        # Also replace any other hardcoded references
-        html_content = html_content.replace(
-            'http://localhost:5000/api',
-            api_base_url
-        )
+        page = index_renderer.render(api_base_url)
 
-        logger.info(f"✅ Successfully serving {CUSTOM_BRAND} from {found_path} with API URL: {api_base_url}")
-        return html_content
+        response = _cached_page_response(page)
+        response.content_type = 'text/html; charset=utf-8'
+        response.last_modified = page.last_modified
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     except FileNotFoundError:
         logger.warning("❌ client.html not found - serving fallback page")
-        print(f"🔍 DEBUG - Available files in current directory: {[f for f in os.listdir('.') if f.endswith('.html')]}")
 
         return f"""
         <!DOCTYPE html>
@@ -477,6 +791,70 @@ def assess_patient():
         }), 500
 
 
+@app.route('/api/assess/batch', methods=['POST'])
+def assess_batch():
+    """Assess a caseload sent as a JSON array or NDJSON body"""
+    try:
+        try:
+            records = parse_batch_payload(request.get_data(as_text=True), MAX_BATCH_SIZE)
+        except BatchTooLargeError as e:
+            return jsonify({
+                'success': False,
+                'error': 'Batch too large',
+                'message': str(e)
+            }), 413
+        except BatchPayloadError as e:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid batch payload',
+                'message': str(e)
+            }), 400
+
+        results = web_chatbot.generate_batch_assessment(records)
+        succeeded = sum(1 for result in results if result.get('success'))
+
+        logger.info(f"Batch assessment completed: {succeeded}/{len(results)} records succeeded")
+
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        })
+
+    except Exception as e:
+        logger.error(f"Batch assessment endpoint error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Server error',
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/assess/stream', methods=['POST'])
+def assess_stream():
+    """Assess an NDJSON caseload incrementally, streaming one NDJSON result per record"""
+    # request.stream would apply MAX_CONTENT_LENGTH to the whole caseload
+    stream = get_input_stream(request.environ, max_content_length=None)
+    records = iter_ndjson_records(read_bounded_lines(stream, MAX_STREAM_LINE_LENGTH), MAX_STREAM_LINE_LENGTH)
+
+    def generate():
+        count = 0
+        succeeded = 0
+
+        for result in web_chatbot.stream_assessments(records):
+            count += 1
+            if result.get('success'):
+                succeeded += 1
+            yield encode_json(result) + b'\n'
+
+        logger.info(f"Streaming assessment completed: {succeeded}/{count} records succeeded")
+        yield encode_json({'summary': {'count': count, 'succeeded': succeeded, 'failed': count - succeeded}}) + b'\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/validate', methods=['POST'])
 def validate_field():
     """Validate individual fields (for real-time validation)"""
@@ -486,24 +864,17 @@ def validate_field():
         field_value = data.get('value')
         context = data.get('context', {})
 
-        if field_name == 'name':
-            result = web_chatbot.validator.validate_name(field_value)
-        elif field_name == 'age':
-            result = web_chatbot.validator.validate_age(str(field_value))
-        elif field_name == 'city':
-            country = context.get('country', '')
-            result = web_chatbot.validator.validate_city(field_value, country)
-        else:
+        if field_name not in VALIDATION_DISPATCH:
             return jsonify({
                 'success': False,
                 'message': f'Validation not implemented for field: {field_name}'
             })
 
+        result = web_chatbot.validate_fields({field_name: field_value}, context)[field_name]
+
         return jsonify({
             'success': True,
-            'is_valid': result.is_valid,
-            'message': result.error_message if not result.is_valid else 'Valid',
-            'suggestions': result.suggestions
+            **result
         })
 
     except Exception as e:
@@ -513,22 +884,23 @@ def validate_field():
         }), 500
 
 
-@app.route('/api/countries', methods=['GET'])
-def get_countries():
-    """Get list of available countries"""
+@app.route('/api/validate/batch', methods=['POST'])
+def validate_fields_batch():
+    """Validate any subset of the form in one request"""
     try:
-        countries = []
-        for country_code, country_data in web_chatbot.chatbot.health_db.country_health_data.items():
-            countries.append({
-                'code': country_code,
-                'name': country_code.replace('_', ' ').title(),
-                'crisis_resources': country_data.get('crisis_resources', []),
-                'healthcare_system': country_data.get('healthcare_system', '').replace('_', ' ').title()
-            })
+        data = request.get_json()
+        fields = data.get('fields') if data else None
+
+        if not isinstance(fields, dict):
+            return jsonify({
+                'success': False,
+                'error': 'No fields provided',
+                'message': 'Send {"fields": {"<field>": <value>, ...}, "context": {...}}'
+            }), 400
 
         return jsonify({
             'success': True,
-            'countries': countries
+            'results': web_chatbot.validate_fields(fields, data.get('context', {}))
         })
 
     except Exception as e:
@@ -538,25 +910,116 @@ def get_countries():
         }), 500
 
 
+def _country_list():
+    """All countries with their crisis resources, from the manifest summaries (no shard loads)"""
+    health_db = web_chatbot.chatbot.health_db
+    countries = []
+    for country_code in health_db.country_health_data:
+        summary = health_db.country_summary(country_code)
+        countries.append({
+            'code': country_code,
+            'name': country_code.replace('_', ' ').title(),
+            'crisis_resources': summary.get('crisis_resources', []),
+            'healthcare_system': summary.get('healthcare_system', '').replace('_', ' ').title()
+        })
+    return countries
+
+
+def _emergency_resources(country_code):
+    """Emergency resources for one country, or None if the country is unknown"""
+    country_data = web_chatbot.chatbot.health_db.country_health_data.get(country_code, {})
+    if not country_data:
+        return None
+
+    return {
+        'country': country_code.replace('_', ' ').title(),
+        'crisis_resources': country_data.get('crisis_resources', []),
+        'healthcare_system': country_data.get('healthcare_system', '').replace('_', ' ').title(),
+        'mental_health_prevalence': country_data.get('mental_health_prevalence', 0.20) * 100
+    }
+
+
+def _bootstrap_payload():
+    """Every country and its emergency resources in one payload, tagged with the data version"""
+    health_db = web_chatbot.chatbot.health_db
+    return {
+        'success': True,
+        'data_version': health_db.data_version,
+        'countries': _country_list(),
+        'emergency_resources': {
+            country_code: _emergency_resources(country_code) for country_code in health_db.country_health_data
+        }
+    }
+
+
+def _countries_page():
+    return reference_payloads.get('countries', lambda: {'success': True, 'countries': _country_list()})
+
+
+def _emergency_resources_page(country_code):
+    def build():
+        resources = _emergency_resources(country_code)
+        return dict(resources, success=True) if resources is not None else None
+
+    return reference_payloads.get(f'emergency-resources/{country_code}', build)
+
+
+def build_reference_payloads():
+    """Serialize every reference payload now instead of on first request (see wsgi.py)"""
+    reference_payloads.get('bootstrap', _bootstrap_payload)
+    _countries_page()
+    for country_code in web_chatbot.chatbot.health_db.country_health_data:
+        _emergency_resources_page(country_code)
+
+
+def _reference_response(page):
+    """Serve a pre-serialized reference payload with its ETag, answering 304 when it matches"""
+    response = _cached_page_response(page)
+    response.content_type = 'application/json'
+    response.cache_control.public = True
+    response.cache_control.max_age = REFERENCE_CACHE_MAX_AGE
+    return response.make_conditional(request)
+
+
+@app.route('/api/countries', methods=['GET'])
+def get_countries():
+    """Get list of available countries"""
+    try:
+        return _reference_response(_countries_page())
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/emergency-resources/<country_code>', methods=['GET'])
 def get_emergency_resources(country_code):
     """Get emergency resources for a specific country"""
     try:
-        country_data = web_chatbot.chatbot.health_db.country_health_data.get(country_code, {})
+        page = _emergency_resources_page(country_code)
 
-        if not country_data:
+        if page is None:
             return jsonify({
                 'success': False,
                 'error': 'Country not found'
             }), 404
 
+        return _reference_response(page)
+
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'country': country_code.replace('_', ' ').title(),
-            'crisis_resources': country_data.get('crisis_resources', []),
-            'healthcare_system': country_data.get('healthcare_system', '').replace('_', ' ').title(),
-            'mental_health_prevalence': country_data.get('mental_health_prevalence', 0.20) * 100
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """Countries and emergency resources in one versioned payload, fetched once per client session"""
+    try:
+        return _reference_response(reference_payloads.get('bootstrap', _bootstrap_payload))
 
     except Exception as e:
         return jsonify({
@@ -567,36 +1030,257 @@ def get_emergency_resources(country_code):
 
 @app.route('/api/save-assessment', methods=['POST'])
 def save_assessment():
-    """Save assessment results to file"""
+    """Queue assessment results for saving; the write happens in the background"""
     try:
         data = request.get_json()
-        patient_name = data.get('patient_name', 'Unknown')
-        country = data.get('country', 'Unknown')
         assessment_data = data.get('assessment_data', {})
 
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"web_assessment_{patient_name.replace(' ', '_')}_{country}_{timestamp}.json"
+        assessment_id = web_chatbot.save_queue.submit(assessment_data)
+
+        logger.info(f"Assessment queued for saving: {assessment_id}")
+
+        return jsonify({
+            'success': True,
+            'assessment_id': assessment_id,
+            'message': 'Assessment accepted for saving'
+        }), 202
+
+    except QueueFullError as e:
+        logger.warning(f"Dropped assessment save: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Save queue is full',
+            'message': 'The server is busy saving other assessments; please retry shortly'
+        }), 503
+
+    except Exception as e:
+        logger.error(f"Error saving assessment: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _parse_time_param(value):
+    """Epoch seconds or an ISO-8601 time (UTC unless it has an offset) from a query parameter"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return parsed.timestamp()
+
+
+def require_assessments_token(view):
+    """Refuse a request for saved assessments unless it carries ASSESSMENTS_API_TOKEN as a bearer token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ASSESSMENTS_API_TOKEN:
+            return jsonify({
+                'success': False,
+                'error': 'Not found',
+                'message': 'Reading saved assessments is disabled; set ASSESSMENTS_API_TOKEN to enable it'
+            }), 404
+
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode('utf-8'),
+                                                                 ASSESSMENTS_API_TOKEN.encode('utf-8')):
+            response = jsonify({
+                'success': False,
+                'error': 'Unauthorized',
+                'message': 'A valid bearer token is required'
+            })
+            response.headers['WWW-Authenticate'] = 'Bearer'
+            return response, 401
+
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@app.route('/api/assessments', methods=['GET'])
+@require_assessments_token
+def list_assessments():
+    """List saved assessments, newest first, filtered and paginated with an opaque cursor"""
+    try:
+        limit = min(max(int(request.args.get('limit', ASSESSMENT_PAGE_SIZE)), 1), MAX_ASSESSMENT_PAGE_SIZE)
+        since = _parse_time_param(request.args.get('since'))
+        until = _parse_time_param(request.args.get('until'))
+        filters = {column: request.args.get(column) or None for column in FILTER_COLUMNS}
+        cursor = request.args.get('cursor') or None
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid query parameter',
+            'message': str(e)
+        }), 400
+
+    try:
+        # One extra row tells whether another page exists
+        rows = web_chatbot.assessment_store.query(limit=limit + 1, since=since, until=until, cursor=cursor,
+                                                  **filters)
+    except NotImplementedError:
+        return jsonify({
+            'success': False,
+            'error': 'Not supported',
+            'message': f'The {ASSESSMENT_STORE} assessment store cannot be queried'
+        }), 501
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid query parameter',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error listing assessments: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]['created_at'], page[-1]['seq']) if len(rows) > limit else None
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(assessment_data, f, indent=2, ensure_ascii=False)
+    return jsonify({
+        'success': True,
+        'count': len(page),
+        'assessments': [
+            {
+                'id': row['id'],
+                'created_at': datetime.datetime.fromtimestamp(row['created_at'], datetime.timezone.utc).isoformat(),
+                'country': row['country'],
+                'risk_level': row['risk_level'],
+                'age_category': row['age_category'],
+                'mental_state': row['mental_state']
+            }
+            for row in page
+        ],
+        'next_cursor': next_cursor
+    })
 
-        logger.info(f"Assessment saved to file: {filename}")
+
+@app.route('/api/assessments/<assessment_id>', methods=['GET'])
+@require_assessments_token
+def get_saved_assessment(assessment_id):
+    """Return one saved assessment in full"""
+    try:
+        assessment = web_chatbot.assessment_store.get(assessment_id)
+
+        if assessment is None:
+            return jsonify({
+                'success': False,
+                'error': 'Assessment not found'
+            }), 404
 
         return jsonify({
             'success': True,
-            'filename': filename,
-            'message': 'Assessment saved successfully'
+            'assessment_id': assessment_id,
+            'assessment': assessment
         })
 
     except Exception as e:
-        logger.error(f"Error saving assessment: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
+def _analytics_request(compute):
+    """Sync the analytics arrays and run one query, mapping failures to JSON errors"""
+    if web_chatbot.analytics is None:
+        return jsonify({
+            'success': False,
+            'error': 'Not available',
+            'message': 'Caseload analytics needs NumPy (pip install -r requirements.txt)'
+        }), 501
+
+    try:
+        if not web_chatbot.sync_analytics():
+            return jsonify({
+                'success': False,
+                'error': 'Not supported',
+                'message': f'The {ASSESSMENT_STORE} assessment store cannot be queried'
+            }), 501
+
+        since = _parse_time_param(request.args.get('since'))
+        until = _parse_time_param(request.args.get('until'))
+        filters = {field: request.args.get(field) or None for field in ANALYTICS_FIELDS}
+        if filters['country']:
+            filters['country'] = country_code(filters['country'])
+        if filters['financial_status']:
+            filters['financial_status'] = normalize_label(filters['financial_status'])
+        result = compute(since, until, filters)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid query parameter',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Analytics query failed: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    result['success'] = True
+    return jsonify(result)
+
+
+@app.route('/api/analytics/counts', methods=['GET'])
+def analytics_counts():
+    """Saved assessments per value of one field (?by=risk_level), with optional filters"""
+    by = request.args.get('by', 'risk_level')
+    return _analytics_request(
+        lambda since, until, filters: dict(web_chatbot.analytics.group_counts(by, since, until, **filters), by=by))
+
+
+@app.route('/api/analytics/crosstab', methods=['GET'])
+def analytics_crosstab():
+    """Counts for every pair of values of two fields (?rows=country&columns=risk_level)"""
+    rows = request.args.get('rows', 'country')
+    columns = request.args.get('columns', 'risk_level')
+    return _analytics_request(
+        lambda since, until, filters: web_chatbot.analytics.crosstab(rows, columns, since, until, **filters))
+
+
+@app.route('/api/analytics/timeline', methods=['GET'])
+def analytics_timeline():
+    """Saved assessments per hour, day or week (?bucket=day), optionally split by a field (?by=risk_level)"""
+    bucket = request.args.get('bucket', 'day')
+    by = request.args.get('by') or None
+    return _analytics_request(
+        lambda since, until, filters: web_chatbot.analytics.histogram(bucket, by, since, until, **filters))
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose internal cache and queue counters"""
+    return jsonify({
+        'success': True,
+        'assessment_cache': web_chatbot.assessment_cache.stats(),
+        'country_data': web_chatbot.chatbot.health_db.store.stats(),
+        'save_queue': web_chatbot.save_queue.stats(),
+        'assessment_log': web_chatbot.assessment_log.stats() if web_chatbot.assessment_log is not None else None,
+        'analytics': web_chatbot.analytics.stats() if web_chatbot.analytics is not None else None,
+        'reference_payloads': reference_payloads.stats(),
+        'json_backend': JSON_BACKEND,
+        'compression': compressor.stats()
+    })
+
+
 # Error handlers
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({
+        'success': False,
+        'error': 'Request too large',
+        'message': f"Request bodies may be at most {app.config['MAX_CONTENT_LENGTH']} bytes"
+    }), 413
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -647,7 +1331,15 @@ if __name__ == '__main__':
         print(f"🌟 Title: {CUSTOM_TITLE}")
         print("🔗 API endpoints:")
         print(f"   POST /api/assess - Submit patient assessment")
+        print(f"   POST /api/assess/batch - Assess a JSON array or NDJSON caseload")
+        print(f"   POST /api/assess/stream - Stream NDJSON assessments for large caseloads")
         print(f"   POST /api/validate - Validate individual fields")
+        print(f"   POST /api/validate/batch - Validate several fields in one request")
+        print(f"   GET /api/assessments - List saved assessments (filters, cursor pagination)")
+        print(f"   GET /api/assessments/<id> - Get one saved assessment")
+        print(f"   GET /api/analytics/counts - Saved assessments per field value")
+        print(f"   GET /api/analytics/crosstab - Cross-tab of two fields")
+        print(f"   GET /api/analytics/timeline - Saved assessments per time bucket")
         print(f"   GET /api/countries - Get available countries")
         print(f"   GET /api/emergency-resources/<country> - Get emergency contacts")
         print("=" * 80)
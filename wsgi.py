@@ -0,0 +1,57 @@
+"""
+WSGI entry point for production serving
+gunicorn imports this module once in the master process (preload_app in
+gunicorn.conf.py), so the health database, compiled rule index, validator and city
+indexes are built before the workers fork and shared between them copy-on-write:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The reference data is read-only (see country_data.deep_freeze) and, once built, is
+moved out of the garbage collector's reach with gc.freeze(), so collections in the
+workers do not write to (and unshare) the pages holding it. GC_FREEZE=0 turns that
+off for comparison (benchmarks/bench_worker_memory.py).
+"""
+
+import gc
+import logging
+import os
+import time
+
+from city_index import CITY_INDEX
+from web_backend import app, build_reference_payloads, web_chatbot
+
+logger = logging.getLogger(__name__)
+
+GC_FREEZE = os.environ.get('GC_FREEZE', '1') != '0'
+
+
+def warm_up():
+    """Build everything the first requests of each worker would otherwise build lazily"""
+    started = time.perf_counter()
+    chatbot = web_chatbot.chatbot
+
+    # Loads every country shard and expands and indexes its rules
+    chatbot.rule_engine.compile_all()
+
+    for index in CITY_INDEX.values():
+        index.closest('')  # builds the typo index
+
+    # Serialized /api/countries, /api/emergency-resources and /api/bootstrap bodies
+    build_reference_payloads()
+
+    # Workers open their own SQLite connections; do not carry the master's across fork
+    web_chatbot.assessment_store.close()
+
+    if GC_FREEZE:
+        # Collect the start-up garbage first so it is not kept alive in the permanent generation
+        gc.collect()
+        gc.freeze()
+
+    logger.info(f"Preloaded {len(chatbot.health_db.store.countries)} countries and "
+                f"{len(chatbot.rule_engine.rules)} rules in {time.perf_counter() - started:.2f}s"
+                f" ({gc.get_freeze_count()} objects frozen)")
+
+
+warm_up()
+
+application = app